@@ -0,0 +1,257 @@
+"""Benchmark how build.py scales with the size of the catalog
+
+Generates synthetic catalogs (photos.json, movies.json, life.json, ...) with
+non-ASCII titles, long bilingual descriptions and many photos per entry,
+then times full builds, incremental builds after a single-entry change and
+the hot functions (slugify, navigation, create_page).
+
+    python3 bench.py                      # 100, 1000 and 10000 entries
+    python3 bench.py --sizes 100 1000 --jobs 4
+
+Results are stored in .bench/<commit>.json and compared with the previous
+run. Full builds render every entry's navigation into every page, so their
+output grows quadratically; sizes above --full-build-limit only run the
+function benchmarks.
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+
+import build
+
+RESULTS_DIR = '.bench'
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FIRST_NAMES = ['Zoë', 'Jürgen', 'Ångström', 'Renée', 'Søren', 'Günther', 'Élodie', 'Łukasz',
+               'Marlon', 'Ursula', 'Nancy', 'Klaus', 'Þóra', 'Ines', 'Rosel', 'Çelik']
+LAST_NAMES = ['Müller', 'Brando', 'Kinski', 'Schöne', 'Dvořák', 'Andress', 'Núñez', 'Kwan',
+              'Straße', 'Öztürk', 'Hudson', 'Grant', 'Zech', 'Señor', 'Curtis', 'Adorf']
+WORDS_EN = ['portrait', 'film', 'set', 'studio', 'friend', 'Hollywood', 'Berlin', 'camera',
+            'light', 'shadow', 'scene', 'actor', 'director', 'evening', 'premiere', 'archive']
+WORDS_DE = ['Porträt', 'Film', 'Drehort', 'Atelier', 'Freundin', 'Hollywood', 'Berlin', 'Kamera',
+            'Licht', 'Schatten', 'Szene', 'Schauspieler', 'Regisseur', 'Abend', 'Premiere', 'Archiv']
+
+def sentence(rng, words, length):
+    """Return a random sentence of length words"""
+    return ' '.join(rng.choice(words) for _ in range(length)).capitalize() + '.'
+
+def description(rng, words, sentences=6):
+    """Return a multi-paragraph description"""
+    paragraphs = [' '.join(sentence(rng, words, rng.randint(8, 20)) for _ in range(sentences // 2))
+                  for _ in range(2)]
+    return '\n\n'.join(paragraphs)
+
+def make_entry(rng, index, photo_path, max_photos=8):
+    """Return a synthetic photos.json/movies.json entry"""
+    name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index}'
+    return {
+        'title_en': name,
+        'title_de': name.replace(' ', ' von ', 1) if index % 3 == 0 else name,
+        'description_en': description(rng, WORDS_EN),
+        'description_de': description(rng, WORDS_DE),
+        'link': f'https://example.org/{index}',
+        'photos': [{
+            'photo': photo_path,
+            'description_en': sentence(rng, WORDS_EN, 12),
+            'description_de': sentence(rng, WORDS_DE, 12),
+        } for _ in range(rng.randint(2, max_photos))],
+    }
+
+def generate_catalog(root, size, seed=0):
+    """Write a synthetic site with size photo entries below root"""
+    rng = random.Random(seed)
+    photo_path = 'assets/images/dummy.svg'
+    os.makedirs(os.path.join(root, 'data'), exist_ok=True)
+    os.makedirs(os.path.join(root, build.STATIC_DIR, 'assets/images'), exist_ok=True)
+    os.makedirs(os.path.join(root, build.STATIC_DIR, 'assets/css'), exist_ok=True)
+    shutil.copy(os.path.join(REPO_DIR, 'template.html'), root)
+    for path in [photo_path, build.CSS_ASSET]:
+        shutil.copy(os.path.join(REPO_DIR, build.STATIC_DIR, path), os.path.join(root, build.STATIC_DIR, path))
+    for name in ['career.json', 'thea.json']:
+        shutil.copy(os.path.join(REPO_DIR, 'data', name), os.path.join(root, 'data', name))
+
+    catalog = {
+        'photos.json': [make_entry(rng, i, photo_path) for i in range(size)],
+        'movies.json': [make_entry(rng, i, photo_path) for i in range(max(1, size // 10))],
+        'hollywood.json': make_entry(rng, 0, photo_path, max_photos=60),
+        'life.json': {
+            'title_en': 'Biography',
+            'title_de': 'Biographie',
+            'description_en': description(rng, WORDS_EN),
+            'description_de': description(rng, WORDS_DE),
+            'events': [{
+                'date': str(1927 + i % 80),
+                'description_en': sentence(rng, WORDS_EN, 25),
+                'description_de': sentence(rng, WORDS_DE, 25),
+                'photo': photo_path,
+            } for i in range(max(1, size // 10))],
+        },
+    }
+    # thea.json points at images that are not part of the synthetic site
+    with open(os.path.join(root, 'data', 'thea.json'), 'r', encoding='utf-8') as f:
+        thea = json.load(f)
+    thea['photos'] = [{'photo': photo_path}] * len(thea['photos'])
+    catalog['thea.json'] = thea
+    for name, data in catalog.items():
+        with open(os.path.join(root, 'data', name), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    return catalog
+
+def best_of(func, repeat=5):
+    """Return the fastest of repeat runs of func() in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def quiet_build(**kwargs):
+    """Run build.build_site() without its progress output; returns (seconds, outputs)"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        outputs, failures = build.build_site(**kwargs)
+    if failures:
+        raise RuntimeError(f'build failed: {failures}')
+    return time.perf_counter() - start, outputs
+
+def bench_functions(catalog):
+    """Time the per-page hot functions on a catalog"""
+    photos = catalog['photos.json']
+    movies = catalog['movies.json']
+    titles = [item['title_en'] for item in photos]
+    page_name = build.slugify(photos[len(photos) // 2]['title_en'])
+    navs = build.build_navs(photos, movies)
+    with open('template.html', 'r', encoding='utf-8') as f:
+        template = f.read()
+
+    def slugify_all():
+        build.slugify.cache_clear()
+        for title in titles:
+            build.slugify(title)
+
+    def render_one():
+        build.create_page('en', page_name, photos[len(photos) // 2], template, photos, movies, '0', navs=navs)
+
+    os.makedirs('public/en', exist_ok=True)
+    return {
+        'slugify_all': best_of(slugify_all),
+        'get_nav_items': best_of(lambda: build.get_nav_items('en', page_name, photos)),
+        'build_navs': best_of(lambda: build.build_navs(photos, movies)),
+        'mark_active': best_of(lambda: build.mark_active(navs['en'][0], page_name)),
+        'create_page': best_of(render_one),
+    }
+
+def bench_size(size, jobs, full_build_limit):
+    """Run all benchmarks on a synthetic catalog of size entries"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix=f'bench-{size}-') as root:
+        catalog = generate_catalog(root, size)
+        os.chdir(root)
+        try:
+            result = {'entries': size, 'functions': bench_functions(catalog)}
+            if size > full_build_limit:
+                return result
+
+            result['full_build'], outputs = quiet_build(jobs=jobs)
+            result['pages'] = len(outputs)
+            result['output_bytes'] = sum(os.path.getsize(path) for path in outputs)
+            result['noop_build'], _ = quiet_build(incremental=True, jobs=jobs)
+
+            # Edit a single caption, as an editor would
+            photos = catalog['photos.json']
+            photos[size // 2]['description_en'] += ' Edited.'
+            with open('data/photos.json', 'w', encoding='utf-8') as f:
+                json.dump(photos, f, ensure_ascii=False, indent=2)
+            result['single_entry_build'], outputs = quiet_build(incremental=True, jobs=jobs)
+            result['single_entry_pages'] = len(outputs)
+            return result
+        finally:
+            os.chdir(cwd)
+
+def commit_id():
+    """Return the current commit, marked -dirty for uncommitted changes"""
+    try:
+        sha = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return sha + ('-dirty' if dirty else '')
+
+def flatten(results):
+    """Return {'<entries>.<metric>': value} for the timing metrics of a run"""
+    flat = {}
+    for result in results['sizes']:
+        for name, value in result.items():
+            if name == 'functions':
+                for function, seconds in value.items():
+                    flat[f"{result['entries']}.{function}"] = seconds
+            elif name != 'entries':
+                flat[f"{result['entries']}.{name}"] = value
+    return flat
+
+def format_metric(value):
+    """Format seconds with sub-millisecond precision and counts as integers"""
+    if value is None:
+        return ''
+    return f'{value:.5f}' if isinstance(value, float) else str(value)
+
+def print_comparison(current, previous):
+    """Print the metrics of a run next to a previous run"""
+    now = flatten(current)
+    before = flatten(previous) if previous else {}
+    label = previous['commit'] if previous else '-'
+    print(f"{'metric':<32} {current['commit']:>14} {label:>14} {'change':>8}")
+    for name, value in now.items():
+        old = before.get(name)
+        change = f'{(value - old) / old * 100:+7.1f}%' if old else ''
+        print(f"{name:<32} {format_metric(value):>14} {format_metric(old):>14} {change:>8}")
+
+def main(argv=None):
+    """Run the benchmarks, store the results and compare with the last run"""
+    parser = argparse.ArgumentParser(description='Benchmark build.py on synthetic catalogs.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+                        help='numbers of photo entries to benchmark (default: 100 1000 10000)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='worker processes for the builds (0 = one per CPU core)')
+    parser.add_argument('--full-build-limit', type=int, default=1000,
+                        help='only benchmark functions for catalogs larger than this (default: 1000)')
+    parser.add_argument('--compare', metavar='RESULT',
+                        help='results file to compare with (default: the previous run)')
+    args = parser.parse_args(argv)
+    jobs = args.jobs or os.cpu_count() or 1
+
+    results = {'commit': commit_id(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'jobs': jobs, 'sizes': []}
+    for size in args.sizes:
+        print(f"Benchmarking {size} entries...")
+        results['sizes'].append(bench_size(size, jobs, args.full_build_limit))
+
+    results_dir = os.path.join(REPO_DIR, RESULTS_DIR)
+    previous_path = args.compare
+    if previous_path is None:
+        earlier = sorted(glob.glob(os.path.join(results_dir, '*.json')), key=os.path.getmtime)
+        earlier = [path for path in earlier if os.path.basename(path) != f"{results['commit']}.json"]
+        previous_path = earlier[-1] if earlier else None
+    previous = None
+    if previous_path:
+        with open(previous_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+
+    os.makedirs(results_dir, exist_ok=True)
+    with open(os.path.join(results_dir, f"{results['commit']}.json"), 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print_comparison(results, previous)
+
+
+if __name__ == '__main__':
+    main()
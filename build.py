@@ -1,13 +1,306 @@
+import argparse
+import base64
+import collections
+import concurrent.futures
+import contextlib
+import cProfile
+import functools
+import gzip
+import hashlib
+import http.server
+import io
 import json
 import os
+import queue
 import re
+import shutil
+import struct
+import subprocess
+import sys
+import tarfile
+import threading
 import time
 import unicodedata
+import urllib.parse
+import zipfile
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it pages use the originals only
+    Image = ImageOps = None
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it only .gz files are written
+    brotli = None
+
+try:
+    import resource
+except ImportError:  # not available on Windows; profiles then omit peak memory
+    resource = None
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; the asset store then copies instead of cloning
+    fcntl = None
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog is optional; --watch falls back to polling
+    Observer = None
+
+# Build state (incremental manifest, caches) lives outside public/
+CACHE_DIR = '.build-cache'
+MANIFEST_PATH = os.path.join(CACHE_DIR, 'manifest.json')
+PROFILE_PATH = os.path.join(CACHE_DIR, 'profile.json')
+COMPRESS_INDEX_PATH = os.path.join(CACHE_DIR, 'compressed.json')
+# Every build writes a complete release into STAGING_DIR, which then moves
+# to RELEASES_DIR; public is a symlink to the current release. DEPLOY_INDEX_PATH
+# records the content hash of every file in public/
+STAGING_DIR = os.path.join(CACHE_DIR, 'staging')
+RELEASES_DIR = os.path.join(CACHE_DIR, 'releases')
+DEPLOY_INDEX_PATH = os.path.join(CACHE_DIR, 'deploy.json')
+# The deploy manifest kept in a --publish target
+DEPLOY_MANIFEST_NAME = '.deploy-manifest.json'
+# Transfer weight of every page (HTML, stylesheets and image src files)
+WEIGHT_REPORT_PATH = os.path.join(CACHE_DIR, 'weights.json')
+ASSET_INDEX_PATH = os.path.join(CACHE_DIR, 'assets.json')
+# Compact records (titles, photo paths, content hash) of the per-entry data
+# files in data/photos/ and data/movies/, re-read only when a file changes
+CATALOG_INDEX_PATH = os.path.join(CACHE_DIR, 'catalog.json')
+
+DERIVATIVE_INDEX_PATH = os.path.join(CACHE_DIR, 'derivatives.json')
+DERIVED_CACHE_DIR = os.path.join(CACHE_DIR, 'derived')
+# Content-addressed store of the files published from static/; each of them
+# under public/ is a hardlink to its object
+STORE_DIR = os.path.join(CACHE_DIR, 'store')
+# Linux ioctl that makes a reflink (copy-on-write) copy
+FICLONE = 0x40049409
+
+# Files published as they are: the images the data files and pages
+# reference and the stylesheet. A file's path below static/ is its path in
+# the site; the build links them into public/, which is never edited by hand
+STATIC_DIR = 'static'
+
+# Stylesheet produced by `yarn run build-css` and the script of the pages,
+# relative to static/ and public/
+CSS_ASSET = 'assets/css/style.css'
+JS_ASSET = 'assets/js/site.js'
+
+# Responsive image derivatives, encoded into DERIVED_CACHE_DIR, named by
+# source hash and published below public/DERIVED_DIR
+DERIVED_DIR = 'assets/derived'
+DERIVATIVE_WIDTHS = (480, 960, 1600)
+DERIVATIVE_QUALITY = {'avif': 55, 'webp': 80}
+RASTER_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+# Text files under public/ that get precompressed .gz/.br siblings (--compress)
+COMPRESS_EXTENSIONS = ('.html', '.css', '.js', '.json', '.svg')
+
+# --optimize: HTML minification keeps these elements verbatim, and the
+# critical CSS inlined into each page covers the classes used before the
+# first lazily loaded image, at most FOLD_CHARS into the main content.
+# Elements that start off-canvas (the mobile sidebar) only count with their
+# own classes, not with their content
+PRESERVED_ELEMENTS = re.compile(r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.S | re.I)
+HTML_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.S)
+HTML_WHITESPACE = re.compile(r'[ \t\r\n\f]+')
+BLOCK_TAG = re.compile(r' ?(</?(?:!doctype|html|head|body|meta|link|title|header|nav|main|div|section|'
+                       r'article|aside|footer|ul|ol|li|h[1-6]|p|br|hr|figure|figcaption|noscript|'
+                       r'table|thead|tbody|tr|td|th)\b[^>]*>) ?', re.I)
+STYLESHEET_LINK = re.compile(r'<link href="([^"]*style\.css[^"]*)" rel="stylesheet">')
+CLASS_ATTRIBUTE = re.compile(r'\bclass="([^"]*)"')
+CSS_CLASS = re.compile(r'\.((?:\\.|[\w-])+)')
+IMG_SRC = re.compile(r'<img\b[^>]*?\ssrc="([^"]+)"')
+STYLESHEET_HREF = re.compile(r'<link\b[^>]*?\shref="([^"]+\.css(?:\?[^"]*)?)"')
+CSS_TYPE = re.compile(r'(?<![\w.#:\\-])([a-z][a-z0-9]*)')
+HTML_TAG = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)')
+FOLD_CHARS = 6000
+OFFCANVAS_TAG = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)\b[^>]*\sclass="(?:[^"]*\s)?-translate-x-full[\s"][^>]*>')
+# Pages whose critical CSS would be larger keep the blocking stylesheet link
+CRITICAL_CSS_LIMIT = 12 * 1024
+# Not needed for the first paint: selectors for interaction states, form
+# internals and vendor pseudo-elements, and transitions
+NONCRITICAL_SELECTOR = re.compile(r'::?-(?:webkit|moz|ms|o)-|::(?:backdrop|file-selector-button)|'
+                                  r':(?:hover|focus|active)\b')
+NONCRITICAL_DECLARATION = re.compile(r'(?:transition|animation)(?:-[\w-]+)?\s*:')
+CUSTOM_PROPERTY = re.compile(r'(?<=[{;])(--[\w-]+):[^;{}]*(?:;|(?=\}))')
+PROPERTY_RULE = re.compile(r'@property (--[\w-]+)\{[^{}]*\}')
+EMPTY_BLOCK = re.compile(r'(?<=[{};])[^{};]+\{\}|^[^{};]+\{\}')
+# Classes set by script before the first paint
+SCRIPT_CLASSES = {'dark'}
+
+# Image metadata: width of the inline blurred preview, and how many photos at
+# the top of a page load eagerly (everything below the fold is lazy)
+PREVIEW_WIDTH = 12
+EAGER_IMAGES = 2
+
+# Photo grids with more than GALLERY_BATCH photos render only the first batch
+# into the page; the others are written to public/<lang>/gallery/<page>/<n>.json
+# and appended by the page script as the reader scrolls (--gallery-batch)
+GALLERY_BATCH = 8
+
+LANGUAGES = ('en', 'de')
+
+# What render_site() and build_site() render:
+#   data_dir       the data files (life.json, photos.json, ...)
+#   template       the page template
+#   languages      the languages to render, a subset of LABELS
+#   gallery_batch  photos in a grid before the rest load on scroll
+#   copy_assets    also write the static files and derivatives
+#   static_dir     where the stylesheet, script and images are read from
+#   cache_dir      the build caches (None: none are read or written)
+#   build_assets   run the asset store and encode missing derivatives
+# build_site() always copies and builds the assets, caching in CACHE_DIR.
+SiteConfig = collections.namedtuple(
+    'SiteConfig', 'data_dir template languages gallery_batch copy_assets static_dir cache_dir build_assets',
+    defaults=('data', 'template.html', LANGUAGES, GALLERY_BATCH, False, STATIC_DIR, CACHE_DIR, False))
+
+NAV_ACTIVE_CLASS = 'font-semibold bg-gray-200 dark:bg-gray-800 dark:text-gray-100'
+
+# Client-side search (public/<lang>/search/): terms shorter than
+# SEARCH_MIN_TERM and stopwords are not indexed (index.json passes both on
+# to the search script), and the document list is
+# split into files of SEARCH_DOCS_PER_FILE entries
+SEARCH_MIN_TERM = 2
+SEARCH_DOCS_PER_FILE = 500
+# Catalog index entries made with other parameters are re-read
+CATALOG_PARAMS = f"terms-{'-'.join(LANGUAGES)}-{SEARCH_MIN_TERM}"
+SEARCH_STOPWORDS = {
+    'en': 'a an and are as at be but by for from had has he her his in is it its of on or she '
+          'that the their they this to was were which with',
+    'de': 'als am an auch auf aus bei bis das dass dem den der des die ein eine einem einen einer '
+          'er es für hat im in ist mit nach nicht noch sich sie und von vor war wie wird zu zum zur',
+}
+
+# Sources that trigger a rebuild in --watch mode
+WATCH_PATHS = ('data', STATIC_DIR, 'template.html', 'input.css')
+
+# Injected into HTML served by the --watch preview server
+LIVE_RELOAD_SCRIPT = """<script>
+    (function() {
+        // Follow the page on screen across client-side navigation
+        let source = null;
+        function subscribe() {
+            if (source) source.close();
+            source = new EventSource('/__livereload?path=' + encodeURIComponent(location.pathname));
+            source.addEventListener('reload', () => location.reload());
+        }
+        subscribe();
+        document.addEventListener('pagechange', subscribe);
+    })();
+</script>
+"""
+
+# Template slots: {{ name }}
+# Service worker written to public/sw.js; {{ version }} is the hash of
+# public/precache.json, so every manifest change makes browsers install the
+# new worker, which then fetches only the entries whose revision changed
+SERVICE_WORKER = """// Generated by build.py - do not edit
+const VERSION = '{{ version }}';
+const CACHE = 'ina-berneis';
+const BASE = new URL('./', self.location).href;
+const MANIFEST_KEY = BASE + '__precache/current';
+const PENDING_KEY = BASE + '__precache/pending';
+// Only the landing page of the language index.html redirects to is installed
+const LANGUAGES = {{ languages }};
+const LANG = LANGUAGES.find(lang => (self.navigator.language || '').startsWith(lang)) || LANGUAGES[0];
+let manifest = null;
+
+function installed(path) {
+    const lang = path.split('/')[0];
+    return !LANGUAGES.includes(lang) || lang === LANG;
+}
+
+function revision(entries, path) {
+    return entries.precache[path] || entries.runtime[path];
+}
+
+async function storedManifest(key) {
+    const response = await (await caches.open(CACHE)).match(key);
+    return response ? response.json() : { precache: {}, runtime: {} };
+}
+
+// Fetch the precache entries that are new or whose revision changed
+self.addEventListener('install', event => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(CACHE);
+        const next = await (await fetch(BASE + 'precache.json?v=' + VERSION, { cache: 'no-cache' })).json();
+        const previous = await storedManifest(MANIFEST_KEY);
+        const changed = Object.keys(next.precache).filter(path => installed(path) && previous.precache[path] !== next.precache[path]);
+        for (let i = 0; i < changed.length; i += 8) {
+            await Promise.all(changed.slice(i, i + 8).map(path => cache.add(new Request(BASE + path, { cache: 'no-cache' }))));
+        }
+        await cache.put(PENDING_KEY, new Response(JSON.stringify(next)));
+        await self.skipWaiting();
+    })());
+});
+
+// Drop entries that left the manifest and those cached on use whose revision changed
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(CACHE);
+        const pending = await cache.match(PENDING_KEY);
+        if (pending) {
+            const previous = await storedManifest(MANIFEST_KEY);
+            const next = await pending.json();
+            for (const request of await cache.keys()) {
+                if (request.url === MANIFEST_KEY || request.url === PENDING_KEY) continue;
+                const path = decodeURIComponent(new URL(request.url).pathname.slice(new URL(BASE).pathname.length));
+                const fresh = path in next.precache && installed(path);
+                const stale = !revision(next, path) || (!fresh && revision(previous, path) !== revision(next, path));
+                if (stale) await cache.delete(request);
+            }
+            await cache.put(MANIFEST_KEY, new Response(JSON.stringify(next)));
+            await cache.delete(PENDING_KEY);
+        }
+        manifest = null;
+        await self.clients.claim();
+    })());
+});
+
+// Serve manifest entries from the cache; runtime entries are cached on first use
+self.addEventListener('fetch', event => {
+    const url = new URL(event.request.url);
+    if (event.request.method !== 'GET' || !url.href.startsWith(BASE)) return;
+    event.respondWith((async () => {
+        manifest = manifest || await storedManifest(MANIFEST_KEY);
+        const key = url.pathname.endsWith('/') ? url.pathname + 'index.html' : url.pathname;
+        const path = decodeURIComponent(key.slice(new URL(BASE).pathname.length));
+        if (!(path in manifest.precache) && !(path in manifest.runtime)) return fetch(event.request);
+        const cache = await caches.open(CACHE);
+        const cached = await cache.match(url.origin + key, { ignoreSearch: true });
+        if (cached) return cached;
+        const response = await fetch(event.request);
+        if (response.ok) await cache.put(url.origin + key, response.clone());
+        return response;
+    })());
+});
+"""
+
+# Served by --watch instead of the real worker: it removes itself and its
+# caches, so the preview always shows the freshly built files
+PREVIEW_SERVICE_WORKER = """self.addEventListener('install', () => self.skipWaiting());
+self.addEventListener('activate', event => {
+    event.waitUntil(caches.keys()
+        .then(keys => Promise.all(keys.map(key => caches.delete(key))))
+        .then(() => self.registration.unregister()));
+});
+"""
+
+SLOT_PATTERN = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+# `sizes` attribute for each place a photo is rendered
+SIZES_PORTRAIT = '(min-width: 768px) 20rem, 75vw'
+SIZES_TIMELINE = '(min-width: 768px) 12rem, 8rem'
+SIZES_GRID = '(min-width: 1024px) 30rem, 100vw'
 
 def nl2br(text):
     """Convert newlines to HTML <br> tags"""
     return text.replace('\n', '<br>')
 
+@functools.lru_cache(maxsize=None)
 def slugify(text):
     """Convert text to URL-friendly slug"""
     # Normalize unicode characters (e.g., ö -> o)
@@ -17,174 +310,1521 @@ def slugify(text):
     text = re.sub(r'[-\s]+', '-', text).strip('-')
     return text
 
-def load_photos():
+def hash_inputs(*parts):
+    """Return a stable hash of JSON-serializable build inputs"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file's contents"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def cache_file(cache_dir, path):
+    """Return where a cache file below CACHE_DIR lives in cache_dir (None without a cache)"""
+    return os.path.join(cache_dir, os.path.relpath(path, CACHE_DIR)) if cache_dir else None
+
+def load_asset_index(path=ASSET_INDEX_PATH):
+    """Load the cached content hashes of files under public/"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (TypeError, FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_asset_index(index, path=ASSET_INDEX_PATH):
+    """Write the asset index for the next build (unless it is unchanged)"""
+    if path is None:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_if_changed(path, json.dumps(index, indent=2, sort_keys=True, ensure_ascii=False))
+
+def read_image_size(path):
+    """Read (width, height) from a PNG, GIF, JPEG or WebP header (None if unknown)"""
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        if head.startswith(b'\x89PNG\r\n\x1a\n'):
+            return struct.unpack('>II', head[16:24])
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10])
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            chunk = head[12:16]
+            if chunk == b'VP8X':
+                return (int.from_bytes(head[24:27], 'little') + 1,
+                        int.from_bytes(head[27:30], 'little') + 1)
+            if chunk == b'VP8 ':
+                f.seek(26)
+                width, height = struct.unpack('<HH', f.read(4))
+                return width & 0x3fff, height & 0x3fff
+            if chunk == b'VP8L':
+                bits = int.from_bytes(head[21:25], 'little')
+                return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+            return None
+        if head[:2] == b'\xff\xd8':
+            # Walk the JPEG segments up to the first start-of-frame marker
+            f.seek(2)
+            while True:
+                marker = f.read(2)
+                if len(marker) < 2 or marker[0] != 0xff:
+                    return None
+                if marker[1] in (0xc0, 0xc1, 0xc2, 0xc3, 0xc5, 0xc6, 0xc7,
+                                 0xc9, 0xca, 0xcb, 0xcd, 0xce, 0xcf):
+                    height, width = struct.unpack('>xHH', f.read(7)[2:])
+                    return width, height
+                length = struct.unpack('>H', f.read(2))[0]
+                f.seek(length - 2, 1)
+    return None
+
+def image_metadata(path):
+    """Return intrinsic size, average color and a tiny preview for an image
+
+    Without Pillow only the dimensions (read from the file header) are known.
+    Images with transparency get neither: a placeholder would show through.
+    """
+    if Image is None:
+        size = read_image_size(path)
+        return {'width': size[0], 'height': size[1]} if size else {}
+    with Image.open(path) as image:
+        width, height = image.size
+        # EXIF orientations 5-8 are rotated by 90 degrees when displayed
+        if image.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+            width, height = height, width
+        if 'A' in image.getbands() or 'transparency' in image.info:
+            return {'width': width, 'height': height}
+        rgb = image.convert('RGB')
+    red, green, blue = rgb.resize((1, 1), Image.BOX).getpixel((0, 0))
+    preview = rgb.resize((PREVIEW_WIDTH, max(1, round(PREVIEW_WIDTH * rgb.height / rgb.width))), Image.BOX)
+    buffer = io.BytesIO()
+    preview.save(buffer, 'WEBP', quality=40)
+    return {
+        'width': width,
+        'height': height,
+        'color': f'#{red:02x}{green:02x}{blue:02x}',
+        'preview': 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii'),
+    }
+
+def index_asset(index, path, root=STATIC_DIR):
+    """Return the index entry of a file under static/ (None if missing)
+
+    Entries hold the content hash and, for raster images, the metadata from
+    image_metadata() with the parameters it was made with (meta_params).
+    Files are only re-read when their size or mtime differs from the index,
+    and metadata is recomputed when the parameters changed - e.g. once Pillow
+    is installed.
+    """
+    full_path = os.path.join(root, path)
+    try:
+        st = os.stat(full_path)
+    except FileNotFoundError:
+        return None
+    entry = index.get(path)
+    if not entry or entry['mtime'] != st.st_mtime_ns or entry['size'] != st.st_size:
+        entry = {'mtime': st.st_mtime_ns, 'size': st.st_size, 'hash': file_digest(full_path)}
+        index[path] = entry
+    params = hash_inputs(Image is not None, PREVIEW_WIDTH, 'exif-orientation', 'no-alpha-preview')[:8]
+    if path.lower().endswith(RASTER_EXTENSIONS) and entry.get('meta_params') != params:
+        entry['meta'] = image_metadata(full_path)
+        entry['meta_params'] = params
+    return entry
+
+def asset_url(path, assets, prefix='../'):
+    """Return the URL of an asset under public/ with its content hash as version"""
+    version = (assets or {}).get(path, {}).get('version')
+    if version:
+        return f'{prefix}{path}?v={version}'
+    return f'{prefix}{path}'
+
+def render_img(path, alt, assets, sizes, css_class='w-full h-auto', prefix='../', lazy=True):
+    """Return the markup for a photo, as a <picture> with srcsets if derivatives exist
+
+    The <img> always points at the original so the lightbox opens full resolution.
+    Known dimensions become width/height attributes (no layout shift) and the
+    average color and preview are shown as background until the image loads.
+    """
+    info = (assets or {}).get(path, {})
+    attrs = ''
+    if 'width' in info:
+        attrs += f' width="{info["width"]}" height="{info["height"]}"'
+    attrs += ' loading="lazy" decoding="async"' if lazy else ' decoding="async" fetchpriority="high"'
+    if 'preview' in info:
+        attrs += f' style="background:{info["color"]} url({info["preview"]}) center/cover no-repeat"'
+    img = f'<img src="{asset_url(path, assets, prefix)}" alt="{alt}" class="{css_class}"{attrs}>'
+    derivatives = info.get('derivatives')
+    if not derivatives:
+        return img
+    sources = ''
+    for fmt in DERIVATIVE_QUALITY:
+        if fmt in derivatives:
+            srcset = ', '.join(f'{prefix}{url} {width}w' for width, url in derivatives[fmt])
+            sources += f'<source type="image/{fmt}" srcset="{srcset}" sizes="{sizes}">'
+    return f'<picture class="block">{sources}{img}</picture>'
+
+def derivative_formats():
+    """Return the derivative formats the installed Pillow can encode"""
+    if Image is None:
+        return []
+    Image.init()
+    return [fmt for fmt in DERIVATIVE_QUALITY if fmt.upper() in Image.SAVE]
+
+def make_derivatives(source, digest, formats, derived_dir=DERIVED_CACHE_DIR):
+    """Encode resized copies of an image into derived_dir (runs in a worker process)
+
+    Returns {format: [[width, path], ...]} with the paths the copies are
+    published at (below DERIVED_DIR). Images are never upscaled; smaller
+    originals get a single copy at their own width. Copies are turned
+    upright as the EXIF orientation says, matching the dimensions
+    image_metadata() records.
+    """
+    result = {}
+    with Image.open(source) as original:
+        original.load()
+        has_alpha = 'A' in original.getbands() or 'transparency' in original.info
+        image = ImageOps.exif_transpose(original).convert('RGBA' if has_alpha else 'RGB')
+    widths = [w for w in DERIVATIVE_WIDTHS if w < image.width] or [image.width]
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            name = f'{digest[:16]}-{width}.{fmt}'
+            resized.save(os.path.join(derived_dir, name), fmt.upper(), quality=DERIVATIVE_QUALITY[fmt])
+            result.setdefault(fmt, []).append([width, f'{DERIVED_DIR}/{name}'])
+    return result
+
+def build_derivatives(paths, asset_index, static_dir=STATIC_DIR, derived_dir=DERIVED_CACHE_DIR,
+                      index_path=DERIVATIVE_INDEX_PATH, encode=True):
+    """Generate responsive derivatives for raster images, reusing cached ones
+
+    Derivatives are encoded into derived_dir and cached by source hash and
+    encoding parameters, so only new or changed originals are re-encoded.
+    Derivative files and cache entries of images that are no longer among
+    paths (or changed) are removed. Without encode, only the cached
+    derivatives are returned and nothing is written. Returns {path:
+    derivatives}; render_site() writes the files with copy_assets.
+    """
+    formats = derivative_formats()
+    if not formats:
+        print("  Pillow not installed, skipping responsive images")
+        return {}
+    params = hash_inputs(DERIVATIVE_WIDTHS, DERIVATIVE_QUALITY, formats, 'exif_transpose')[:8]
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (TypeError, FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+
+    results = {}
+    pending = {}
+    used = set()
+    for path in paths:
+        if not path.lower().endswith(RASTER_EXTENSIONS) or path not in asset_index:
+            continue
+        key = f"{asset_index[path]['hash']}-{params}"
+        used.add(key)
+        cached = cache.get(key)
+        if cached and all(os.path.exists(os.path.join(derived_dir, os.path.basename(out)))
+                          for variants in cached.values() for _, out in variants):
+            results[path] = cached
+        else:
+            pending.setdefault(key, []).append(path)
+    if not encode or index_path is None:
+        return results
+
+    if pending:
+        print(f"  Encoding derivatives for {len(pending)} images...")
+        os.makedirs(derived_dir, exist_ok=True)
+        with concurrent.futures.ProcessPoolExecutor() as pool:
+            futures = {pool.submit(make_derivatives, os.path.join(static_dir, sources[0]),
+                                   asset_index[sources[0]]['hash'], formats, derived_dir): key
+                       for key, sources in pending.items()}
+            for future in concurrent.futures.as_completed(futures):
+                key = futures[future]
+                cache[key] = future.result()
+                for path in pending[key]:
+                    results[path] = cache[key]
+
+    cache = {key: cache[key] for key in used if key in cache}
+    current = {os.path.basename(out) for derivatives in cache.values()
+               for variants in derivatives.values() for _, out in variants}
+    stale = [name for name in os.listdir(derived_dir) if name not in current] if os.path.isdir(derived_dir) else []
+    for name in stale:
+        os.remove(os.path.join(derived_dir, name))
+    if stale:
+        print(f"  Removed {len(stale)} stale derivatives")
+
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    return results
+
+def data_references(pages, thea):
+    """Return the images referenced by the data files (paths relative to public/)"""
+    references = set()
+    for page_name, data in pages:
+        for item in data.get('photos', []) + data.get('events', []):
+            if 'photo' in item:
+                references.add(item['photo'])
+    references.update(photo['photo'] for photo in thea['photos'])
+    return references
+
+def store_path(digest, path, store_dir=STORE_DIR):
+    """Return the store object of a file with the given content hash"""
+    return os.path.join(store_dir, digest[:2], digest + os.path.splitext(path)[1].lower())
+
+def clone_file(source, destination):
+    """Copy a file with its mtime, sharing its blocks where the filesystem supports reflinks"""
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        try:
+            if fcntl is None:
+                raise OSError
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:  # not Linux, or no reflinks on this filesystem
+            shutil.copyfileobj(src, dst, 1 << 20)
+    shutil.copystat(source, destination)
+
+def store_assets(paths, asset_index, static_dir=STATIC_DIR, store_dir=STORE_DIR, required=()):
+    """Add the files at paths below static_dir to the content-addressed store
+
+    Each file is cloned into one object named by its content hash (a reflink
+    where the filesystem supports it). Sources are never linked, as editors
+    overwrite them in place; objects keep the source's mtime, so one written
+    to through a link in public/ is noticed and cloned again. Missing
+    required paths (the data references), references that differ only in
+    case (the same file on case-insensitive filesystems) and different
+    paths with the same content fail the build before anything is rendered.
+    Objects that are no longer needed are removed.
+
+    Returns {path: object} for the paths that exist.
+    """
+    by_case = {}
+    for path in paths:
+        by_case.setdefault(path.lower(), []).append(path)
+    duplicates = sorted(', '.join(sorted(group)) for group in by_case.values() if len(group) > 1)
+    if duplicates:
+        raise ValueError('Images referenced under paths differing only in case: ' + '; '.join(duplicates))
+
+    objects = {}
+    owners = {}
+    missing = []
+    copies = []
+    for path in sorted(paths):
+        source = os.path.join(static_dir, path)
+        entry = index_asset(asset_index, path, static_dir)
+        if entry is None:
+            if path in required:
+                missing.append(path)
+            continue
+        if entry['hash'] in owners:
+            copies.append(f'{path} (same as {owners[entry["hash"]]})')
+            continue
+        owners[entry['hash']] = path
+        obj = store_path(entry['hash'], path, store_dir)
+        try:
+            st = os.stat(obj)
+            current = (st.st_mtime_ns == entry['mtime'] and st.st_size == entry['size']
+                       and not os.path.samefile(obj, source))
+        except FileNotFoundError:
+            current = False
+        if not current:
+            os.makedirs(os.path.dirname(obj), exist_ok=True)
+            clone_file(source, obj + '.tmp')
+            os.replace(obj + '.tmp', obj)
+        objects[path] = obj
+    if missing:
+        raise FileNotFoundError('Images referenced by the data files are missing: ' + ', '.join(missing))
+    if copies:
+        raise ValueError('Files with the same content under different paths (reference one of them): '
+                         + ', '.join(copies))
+
+    current = set(objects.values())
+    for root, _, names in os.walk(store_dir):
+        for name in names:
+            if os.path.join(root, name) not in current:
+                os.remove(os.path.join(root, name))
+    print(f"  Asset store: {len(objects)} files")
+    return objects
+
+def page_assets(page_name, data):
+    """List the files under public/ referenced by a page rendered from template.html"""
+    if page_name == 'life':
+        return ['assets/images/Ina.png'] + [event['photo'] for event in data['events'] if 'photo' in event]
+    if page_name == 'career':
+        return []
+    paths = [photo['photo'] for photo in data['photos']]
+    if page_name.startswith('movie-') and data.get('imdb'):
+        paths.append('assets/images/imdb.svg')
+    return paths
+
+def load_manifest():
+    """Load the manifest of the previous build (empty if there is none)"""
+    try:
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_manifest(manifest):
+    """Write the build manifest for the next incremental build"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True, ensure_ascii=False)
+
+def nav_signature(photos, movies):
+    """Fields of photos/movies that end up in the navigation shared by every page"""
+    return {
+        'photos': [[item['title_en'], item['title_de']] for item in photos],
+        'movies': [[item['title_en'], item['title_de']] for item in movies],
+    }
+
+def compress_file(path):
+    """Write the .gz and .br siblings of a file (runs in a worker process)
+
+    Siblings are replaced rather than written to, as they may be links of
+    the live release's.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    # mtime=0 keeps the gzip output identical for identical input
+    siblings = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        siblings['.br'] = brotli.compress(data, quality=11)
+    for suffix, compressed in siblings.items():
+        with open(path + suffix + '.tmp', 'wb') as f:
+            f.write(compressed)
+        os.replace(path + suffix + '.tmp', path + suffix)
+
+def compress_outputs(root='public'):
+    """Precompress every HTML/CSS/JS/JSON/SVG file under root across all cores
+
+    Files whose content hash is unchanged since the last run (and whose
+    siblings exist) are skipped; siblings of deleted files are removed.
+    """
+    try:
+        with open(COMPRESS_INDEX_PATH, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        previous = {}
+    suffixes = ['.gz'] + (['.br'] if brotli is not None else [])
+
+    index = {}
+    pending = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            if name.endswith(('.gz', '.br')):
+                if not os.path.exists(path[:-3]):
+                    os.remove(path)
+                continue
+            if not name.endswith(COMPRESS_EXTENSIONS):
+                continue
+            key = os.path.relpath(path, root).replace(os.sep, '/')
+            index[key] = file_digest(path)
+            if index[key] != previous.get(key) or not all(os.path.exists(path + s) for s in suffixes):
+                pending.append(path)
+
+    if pending:
+        print(f"  Compressing {len(pending)} files...")
+        with concurrent.futures.ProcessPoolExecutor() as pool:
+            list(pool.map(compress_file, pending, chunksize=8))
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(COMPRESS_INDEX_PATH, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    return pending
+
+def minify_html(html):
+    """Drop comments and collapse whitespace, leaving <pre>, <textarea>, <script> and <style> untouched"""
+    parts = PRESERVED_ELEMENTS.split(html)
+    # split() yields [text, element, tag name, text, element, tag name, ..., text]
+    out = []
+    for i in range(0, len(parts), 3):
+        text = HTML_WHITESPACE.sub(' ', HTML_COMMENT.sub('', parts[i]))
+        text = BLOCK_TAG.sub(r'\1', text)
+        # Whitespace next to a block-level preserved element does not render
+        if i + 1 < len(parts) and parts[i + 2].lower() != 'textarea':
+            text = text.rstrip(' ')
+        if i > 0 and parts[i - 1].lower() != 'textarea':
+            text = text.lstrip(' ')
+        out.append(text)
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return ''.join(out).strip()
+
+def split_css(text, separator=None):
+    """Split CSS at top-level separator characters, skipping strings and brackets"""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote and text[i - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+def parse_css(text):
+    """Parse a stylesheet into [(prelude, body)]
+
+    body is None for statements (@layer a, b;), a nested rule list for
+    @layer/@media/@supports/@container blocks and the declaration text
+    (including any nested rules) for everything else.
+    """
+    rules = []
+    i = 0
+    while i < len(text):
+        end = i
+        quote = None
+        depth = 0
+        while end < len(text) and (quote or depth or text[end] not in '{;}'):
+            if quote:
+                if text[end] == quote and text[end - 1] != '\\':
+                    quote = None
+            elif text[end] in '"\'':
+                quote = text[end]
+            elif text[end] == '(':
+                depth += 1
+            elif text[end] == ')':
+                depth -= 1
+            end += 1
+        prelude = text[i:end].strip()
+        if end >= len(text) or text[end] != '{':
+            if prelude:
+                rules.append((prelude, None))
+            i = end + 1
+            continue
+        depth = 0
+        close = end
+        quote = None
+        for close in range(end, len(text)):
+            char = text[close]
+            if quote:
+                if char == quote and text[close - 1] != '\\':
+                    quote = None
+            elif char in '"\'':
+                quote = char
+            elif char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+        body = text[end + 1:close].strip()
+        if prelude.split(' ', 1)[0] in ('@layer', '@media', '@supports', '@container'):
+            body = parse_css(body)
+        rules.append((prelude, body))
+        i = close + 1
+    return rules
+
+@functools.lru_cache(maxsize=None)
+def load_stylesheet(path, version):
+    """Return the parsed, whitespace-collapsed rules of a stylesheet (version keys the cache)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = re.sub(r'/\*.*?\*/', '', f.read(), flags=re.S)
+    text = re.sub(r'\s*([{};])\s*', r'\1', re.sub(r'\s+', ' ', text))
+    return parse_css(text)
+
+def selector_requirements(selector):
+    """Return the (class names, element names) a selector refers to"""
+    selector = re.sub(r'\[[^\]]*\]|"[^"]*"|#[\w-]+', '', selector)
+    classes = {re.sub(r'\\(.)', r'\1', name) for name in CSS_CLASS.findall(selector)}
+    return classes, set(CSS_TYPE.findall(CSS_CLASS.sub('', selector)))
+
+def first_paint_body(body):
+    """Return a rule body without its transitions and nested interaction states (&:hover)"""
+    out = []
+    for prelude, inner in body:
+        if inner is None:
+            if not NONCRITICAL_DECLARATION.match(prelude):
+                out.append(prelude + ';')
+        elif prelude.startswith('@') or not NONCRITICAL_SELECTOR.search(prelude):
+            inner = first_paint_body(inner if isinstance(inner, list) else parse_css(inner))
+            if inner:
+                out.append(f'{prelude}{{{inner}}}')
+    return ''.join(out)
+
+def critical_css(rules, classes, tags):
+    """Serialize the rules whose selectors only refer to the given classes and elements
+
+    Selectors without either (theme variables, *, :root) and at-rules such
+    as @property and @font-face are kept; prune_custom_properties() drops
+    the variables nothing reads. Rule bodies go through first_paint_body().
+    """
+    out = []
+    for prelude, body in rules:
+        if body is None:
+            out.append(prelude + ';')
+        elif isinstance(body, list):
+            inner = critical_css(body, classes, tags)
+            if inner:
+                out.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            out.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = []
+            for selector in split_css(prelude, ','):
+                if NONCRITICAL_SELECTOR.search(selector):
+                    continue
+                needed_classes, needed_tags = selector_requirements(selector)
+                if needed_classes <= classes and needed_tags <= tags:
+                    selectors.append(selector.strip())
+            body = first_paint_body(parse_css(body)) if selectors else ''
+            if body:
+                out.append(f"{','.join(selectors)}{{{body}}}")
+    return ''.join(out)
+
+def prune_custom_properties(css, html=''):
+    """Remove the custom properties (and their @property rules) that no var() in css or html reads
+
+    Rules and blocks left empty are removed as well.
+    """
+    while True:
+        used = set(re.findall(r'var\((--[\w-]+)', PROPERTY_RULE.sub('', css) + html))
+        pruned = CUSTOM_PROPERTY.sub(lambda m: m.group(0) if m.group(1) in used else '', css)
+        pruned = PROPERTY_RULE.sub(lambda m: m.group(0) if m.group(1) in used else '', pruned)
+        while EMPTY_BLOCK.search(pruned):
+            pruned = EMPTY_BLOCK.sub('', pruned)
+        if pruned == css:
+            return css
+        css = pruned
+
+def drop_offcanvas(html):
+    """Remove the content of elements that start off-canvas, keeping their own tags"""
+    out = []
+    pos = 0
+    for match in OFFCANVAS_TAG.finditer(html):
+        if match.start() < pos:
+            continue
+        out.append(html[pos:match.end()])
+        pos = len(html)
+        depth = 1
+        for tag in re.finditer(rf'<(/?){match.group(1)}\b[^>]*>', html[match.end():]):
+            depth += -1 if tag.group(1) else 1
+            if depth == 0:
+                pos = match.end() + tag.start()
+                break
+    out.append(html[pos:])
+    return ''.join(out)
+
+def fold_names(html):
+    """Return the (classes, element names) used above the fold of a page"""
+    html = drop_offcanvas(html)
+    start = html.find('<main')
+    if start == -1:
+        start = html.find('<body')
+    fold = start + FOLD_CHARS
+    lazy = html.find('loading="lazy"', start)
+    if lazy != -1:
+        fold = min(fold, lazy)
+    classes = set(SCRIPT_CLASSES)
+    for value in CLASS_ATTRIBUTE.findall(html[:fold]):
+        classes.update(value.split())
+    return classes, {tag.lower() for tag in HTML_TAG.findall(html[:fold])}
+
+def optimize_html(html, css_version):
+    """Inline the page's critical CSS, load the stylesheet asynchronously and minify
+
+    Pages whose critical CSS exceeds CRITICAL_CSS_LIMIT keep the blocking
+    stylesheet link, as inlining would cost more than it saves.
+    """
+    match = STYLESHEET_LINK.search(html)
+    css_path = os.path.join(STATIC_DIR, CSS_ASSET)
+    if match and os.path.exists(css_path):
+        css = critical_css(load_stylesheet(css_path, css_version), *fold_names(html))
+        css = prune_custom_properties(css, html)
+    if match and os.path.exists(css_path) and len(css.encode('utf-8')) <= CRITICAL_CSS_LIMIT:
+        href = match.group(1)
+        head = (f'<style>{css}</style>'
+                f'<link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+                f'<noscript><link href="{href}" rel="stylesheet"></noscript>')
+        html = html[:match.start()] + head + html[match.end():]
+    return minify_html(html)
+
+def gallery_dir(output):
+    """Return the directory of the gallery batch files of a page"""
+    directory, name = os.path.split(output)
+    return os.path.join(directory, 'gallery', os.path.splitext(name)[0])
+
+def fragment_path(output):
+    """Return the client-side navigation fragment of a page"""
+    directory, name = os.path.split(output)
+    return os.path.join(directory, 'fragments', os.path.splitext(name)[0] + '.json')
+
+def swap_staging():
+    """Make the staged release the live public/
+
+    Staging moves to RELEASES_DIR, and the public symlink is pointed at it
+    with a single rename: readers see either the previous build or the new
+    one, never a mix or a missing directory. Older releases are removed.
+    Where symlinks are unsupported, and once when public/ is still a
+    directory, the directory is replaced by two renames instead, leaving
+    public/ missing for a moment.
+    """
+    os.makedirs(RELEASES_DIR, exist_ok=True)
+    release = os.path.join(RELEASES_DIR, str(time.time_ns()))
+    os.rename(STAGING_DIR, release)
+    link = os.path.join(CACHE_DIR, 'public.link')
+    if os.path.lexists(link):
+        os.remove(link)
+    try:
+        os.symlink(os.path.relpath(release), link, target_is_directory=True)
+    except (OSError, NotImplementedError):  # e.g. Windows without the symlink privilege
+        link = None
+
+    old = None
+    if os.path.isdir('public') and not os.path.islink('public'):
+        old = os.path.join(CACHE_DIR, 'old-public')
+        shutil.rmtree(old, ignore_errors=True)
+        os.rename('public', old)
+    os.replace(link or release, 'public')
+    if old:
+        shutil.rmtree(old)
+    for name in os.listdir(RELEASES_DIR):
+        if link is None or name != os.path.basename(release):
+            shutil.rmtree(os.path.join(RELEASES_DIR, name))
+
+def load_deploy_index():
+    """Load {path: {mtime, size, hash}} of the files in public/ after the last build"""
+    try:
+        with open(DEPLOY_INDEX_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def hash_public(known, root='public'):
+    """Return {path: {mtime, size, hash}} for every file under root (public/)
+
+    Files are only re-read when their size or mtime differ from known.
+    """
+    index = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if name.startswith('.'):
+                continue
+            full_path = os.path.join(directory, name)
+            path = os.path.relpath(full_path, root).replace(os.sep, '/')
+            st = os.stat(full_path)
+            entry = known.get(path)
+            if not entry or entry['mtime'] != st.st_mtime_ns or entry['size'] != st.st_size:
+                entry = {'mtime': st.st_mtime_ns, 'size': st.st_size, 'hash': file_digest(full_path)}
+            index[path] = entry
+    return index
+
+def update_deploy_index(known=None):
+    """Hash every file under public/ and diff it against the previous build
+
+    known are entries hashed earlier in this build. Returns (added,
+    changed, removed) lists of paths relative to public/.
+    """
+    previous = load_deploy_index()
+    index = hash_public({**previous, **(known or {})})
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(DEPLOY_INDEX_PATH, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    added = sorted(index.keys() - previous.keys())
+    changed = sorted(path for path in index.keys() & previous.keys()
+                     if index[path]['hash'] != previous[path]['hash'])
+    removed = sorted(previous.keys() - index.keys())
+    return added, changed, removed
+
+def write_if_changed(path, content):
+    """Atomically replace path with content unless it already holds it"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(path + '.tmp', path)
+    return True
+
+def write_service_worker(digests, runtime, writer, languages=LANGUAGES):
+    """Write precache.json and sw.js to writer
+
+    Only the shell is precached: index.html, the stylesheet, the script and
+    the landing page of the reader's language (every page embeds the full
+    navigation, so precaching them all grows with the square of the
+    catalog). The other pages and runtime - the images, fragments, gallery
+    batches and search shards - are cached when first requested. Revisions
+    are the content hashes in digests ({path: SHA-256} of the site's files),
+    so an edit only invalidates the files whose bytes changed.
+    """
+    shell = {'index.html', CSS_ASSET, JS_ASSET} | {f'{lang}/life.html' for lang in languages}
+    pages = {path for path in digests if path.endswith('.html')
+             and (path.split('/', 1)[0] in languages or path == 'thea/index.html')}
+    manifest = {
+        'precache': {path: digests[path][:16] for path in sorted(shell) if path in digests},
+        'runtime': {path: digests[path][:16] for path in sorted((set(runtime) | pages) - shell)
+                    if path in digests},
+    }
+    content = json.dumps(manifest, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    with writer.open('precache.json') as f:
+        f.write(content)
+    with writer.open('sw.js') as f:
+        render_template(compile_template(SERVICE_WORKER), f.write,
+                        {'version': hashlib.sha256(content.encode('utf-8')).hexdigest()[:16],
+                         'languages': json.dumps(list(languages))})
+
+def local_file(page, url):
+    """Return the file under public/ that a URL in page refers to (None for external URLs)"""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    return os.path.normpath(os.path.join(os.path.dirname(page), urllib.parse.unquote(parts.path)))
+
+def page_weight(page):
+    """Return the transfer weight of a page: its HTML, stylesheets and image src files
+
+    Sizes are on-disk bytes; missing files count as 0 and are listed.
+    """
+    with open(page, 'r', encoding='utf-8') as f:
+        text = f.read()
+    stylesheets = {local_file(page, url) for url in STYLESHEET_HREF.findall(text)} - {None}
+    images = {local_file(page, url) for url in IMG_SRC.findall(text)} - {None}
+    sizes = {path: os.path.getsize(path) for path in stylesheets | images if os.path.exists(path)}
+    weight = {
+        'html': os.path.getsize(page),
+        'css': sum(sizes.get(path, 0) for path in stylesheets),
+        'images': dict(sorted(((path, sizes[path]) for path in images if path in sizes), key=lambda x: -x[1])),
+        'missing': sorted(path for path in stylesheets | images if path not in sizes),
+    }
+    weight['total'] = weight['html'] + weight['css'] + sum(weight['images'].values())
+    return weight
+
+def check_page_weights(page_budget=None, image_budget=None):
+    """Write the page weight report and return {path: problem} for everything over budget
+
+    Budgets are in KB; None disables a check.
+    """
+    pages = ['public/index.html', 'public/thea/index.html']
+    for lang in LANGUAGES:
+        folder = os.path.join('public', lang)
+        if not os.path.isdir(folder):
+            continue
+        pages += sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.endswith('.html'))
+    weights = {page: page_weight(page) for page in pages if os.path.exists(page)}
+    report = [{'page': page, **weight} for page, weight in sorted(weights.items(), key=lambda x: -x[1]['total'])]
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(WEIGHT_REPORT_PATH, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"  Heaviest pages (report in {WEIGHT_REPORT_PATH}):")
+    for entry in report[:5]:
+        print(f"    {entry['page']:<60} {entry['total'] / 1024:10.1f} KB "
+              f"({len(entry['images'])} images, {entry['html'] / 1024:.1f} KB HTML)")
+
+    problems = {}
+    for entry in report:
+        if page_budget is not None and entry['total'] > page_budget * 1024:
+            problems[entry['page']] = (f"weighs {entry['total'] / 1024:.1f} KB, "
+                                       f"over the page budget of {page_budget:g} KB")
+        for path, size in entry['images'].items():
+            if image_budget is not None and size > image_budget * 1024 and path not in problems:
+                problems[path] = (f"is {size / 1024:.1f} KB, over the image budget of {image_budget:g} KB "
+                                  f"(used on {entry['page']})")
+    return problems
+
+def publish(target):
+    """Copy the files that differ from target's deploy manifest into target
+
+    Files listed in the target's manifest that are no longer part of the
+    site are deleted; nothing else in target is touched.
+    """
+    manifest = {path: entry['hash'] for path, entry in load_deploy_index().items()}
+    manifest_path = os.path.join(target, DEPLOY_MANIFEST_NAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            published = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        published = {}
+
+    copied = [path for path, digest in sorted(manifest.items())
+              if published.get(path) != digest or not os.path.exists(os.path.join(target, path))]
+    for path in copied:
+        destination = os.path.join(target, path)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copy2(os.path.join('public', path), destination + '.tmp')
+        os.replace(destination + '.tmp', destination)
+    removed = sorted(published.keys() - manifest.keys())
+    for path in removed:
+        try:
+            os.remove(os.path.join(target, path))
+        except FileNotFoundError:
+            pass
+
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    print(f"Published to {target}: {len(copied)} copied, {len(removed)} removed, "
+          f"{len(manifest) - len(copied)} unchanged")
+    return copied, removed
+
+class MemoryWriter:
+    """Keep rendered files in memory as {path: text} (copied assets as bytes)
+
+    Writers receive paths relative to the site root, e.g. en/life.html.
+    """
+
+    def __init__(self):
+        self.files = {}
+
+    @contextlib.contextmanager
+    def open(self, path):
+        """Return a text file whose content becomes path when it is closed"""
+        buffer = io.StringIO()
+        yield buffer
+        self.files[path] = buffer.getvalue()
+
+    def copy(self, path, source):
+        with open(source, 'rb') as f:
+            self.files[path] = f.read()
+
+    def size(self, path):
+        content = self.files[path]
+        return len(content.encode('utf-8') if isinstance(content, str) else content)
+
+    def digests(self):
+        """Return {path: SHA-256} of every file written"""
+        return {path: hashlib.sha256(content.encode('utf-8') if isinstance(content, str) else content).hexdigest()
+                for path, content in self.files.items()}
+
+    def close(self):
+        pass
+
+class DirectoryWriter:
+    """Write rendered files below a directory"""
+
+    def __init__(self, root):
+        self.root = root
+
+    @contextlib.contextmanager
+    def open(self, path):
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w', encoding='utf-8') as f:
+            yield f
+
+    def copy(self, path, source):
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        shutil.copy2(source, full_path)
+
+    def size(self, path):
+        return os.path.getsize(os.path.join(self.root, path))
+
+    def digests(self):
+        """Return {path: SHA-256} of every file below root"""
+        return {path: entry['hash'] for path, entry in hash_public({}, self.root).items()}
+
+    def close(self):
+        pass
+
+class ReleaseWriter(DirectoryWriter):
+    """Write a complete release below root, linking what is unchanged from base
+
+    A file whose content equals base's file at the same path (base is the
+    live public/) becomes a hardlink of it, along with its .gz/.br siblings,
+    so unchanged files are neither rewritten nor compressed again, and
+    nothing is ever written into base. Copied files are linked, never
+    copied. known are base's {path: {mtime, size, hash}} (see hash_public()).
+    """
+
+    def __init__(self, root, base='public', known=None):
+        super().__init__(root)
+        self.base = base
+        self.known = known or {}
+
+    @contextlib.contextmanager
+    def open(self, path):
+        buffer = io.StringIO()
+        yield buffer
+        content = buffer.getvalue()
+        live = os.path.join(self.base, path)
+        try:
+            with open(live, 'r', encoding='utf-8') as f:
+                unchanged = f.read() == content
+        except FileNotFoundError:
+            unchanged = False
+        if unchanged:
+            self.copy(path, live)
+            return
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def copy(self, path, source):
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        try:
+            os.link(source, full_path)
+        except OSError as e:
+            raise OSError(f'Cannot link {source} into the release ({e.strerror}); '
+                          f'{CACHE_DIR} must be on the same filesystem as {self.base}/') from e
+        live = os.path.join(self.base, path)
+        if os.path.exists(live) and os.path.samefile(live, full_path):
+            for suffix in ('.gz', '.br'):
+                if os.path.exists(live + suffix):
+                    os.link(live + suffix, full_path + suffix)
+
+    def keep(self, path):
+        """Link base's version of a page, its fragment and gallery batches into the release
+
+        Anything written for the page before is replaced. Returns False if
+        base does not have the page.
+        """
+        if not os.path.exists(os.path.join(self.base, path)):
+            return False
+        for page_file in (path, fragment_path(path)):
+            for suffix in ('', '.gz', '.br'):
+                if os.path.exists(os.path.join(self.root, page_file + suffix)):
+                    os.remove(os.path.join(self.root, page_file + suffix))
+            if os.path.exists(os.path.join(self.base, page_file)):
+                self.copy(page_file, os.path.join(self.base, page_file))
+        gallery = gallery_dir(path)
+        shutil.rmtree(os.path.join(self.root, gallery), ignore_errors=True)
+        if os.path.isdir(os.path.join(self.base, gallery)):
+            for name in sorted(os.listdir(os.path.join(self.base, gallery))):
+                if not name.endswith(('.gz', '.br')):
+                    self.copy(f'{gallery}/{name}', os.path.join(self.base, gallery, name))
+        return True
+
+    def digests(self):
+        return {path: entry['hash'] for path, entry in hash_public(self.known, self.root).items()}
+
+class OptimizingWriter:
+    """Pass the pages written through it to another writer via optimize_html()"""
+
+    def __init__(self, writer, css_version):
+        self.writer = writer
+        self.css_version = css_version
+
+    @contextlib.contextmanager
+    def open(self, path):
+        if not path.endswith('.html'):
+            with self.writer.open(path) as f:
+                yield f
+            return
+        buffer = io.StringIO()
+        yield buffer
+        with self.writer.open(path) as f:
+            f.write(optimize_html(buffer.getvalue(), self.css_version))
+
+    def copy(self, path, source):
+        self.writer.copy(path, source)
+
+    def keep(self, path):
+        return self.writer.keep(path)
+
+    def size(self, path):
+        return self.writer.size(path)
+
+    def digests(self):
+        return self.writer.digests()
+
+    def close(self):
+        self.writer.close()
+
+class ArchiveWriter:
+    """Write rendered files into a single .zip, .tar, .tar.gz/.tgz, .tar.bz2 or .tar.xz file
+
+    Files are added as they are closed; close() finishes the archive.
+    """
+
+    def __init__(self, path):
+        self.sizes = {}
+        self.hashes = {}
+        if path.endswith('.zip'):
+            self.archive = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+            return
+        for suffix, mode in (('.tar', 'w'), ('.tar.gz', 'w:gz'), ('.tgz', 'w:gz'),
+                             ('.tar.bz2', 'w:bz2'), ('.tar.xz', 'w:xz')):
+            if path.endswith(suffix):
+                self.archive = tarfile.open(path, mode)
+                return
+        raise ValueError(f'unsupported archive type: {path}')
+
+    @contextlib.contextmanager
+    def open(self, path):
+        buffer = io.StringIO()
+        yield buffer
+        self.add(path, buffer.getvalue().encode('utf-8'))
+
+    def add(self, path, content):
+        """Add a file with the given bytes to the archive"""
+        self.sizes[path] = len(content)
+        self.hashes[path] = hashlib.sha256(content).hexdigest()
+        if isinstance(self.archive, zipfile.ZipFile):
+            self.archive.writestr(path, content)
+        else:
+            info = tarfile.TarInfo(path)
+            info.size = len(content)
+            info.mtime = int(time.time())
+            self.archive.addfile(info, io.BytesIO(content))
+
+    def copy(self, path, source):
+        with open(source, 'rb') as f:
+            self.add(path, f.read())
+
+    def size(self, path):
+        return self.sizes[path]
+
+    def digests(self):
+        """Return {path: SHA-256} of every file added"""
+        return dict(self.hashes)
+
+    def close(self):
+        self.archive.close()
+
+def open_writer(target):
+    """Return an ArchiveWriter for archive file names and a DirectoryWriter otherwise"""
+    if target.endswith(('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')):
+        return ArchiveWriter(target)
+    return DirectoryWriter(target)
+
+def load_photos(data_dir='data'):
     """Load all photo entries from photos.json"""
-    with open('data/photos.json', 'r', encoding='utf-8') as f:
+    with open(os.path.join(data_dir, 'photos.json'), 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def load_movies():
+def load_movies(data_dir='data'):
     """Load all movie entries from movies.json"""
-    with open('data/movies.json', 'r', encoding='utf-8') as f:
+    with open(os.path.join(data_dir, 'movies.json'), 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def load_hollywood():
+def load_hollywood(data_dir='data'):
     """Load hollywood.json data"""
-    with open('data/hollywood.json', 'r', encoding='utf-8') as f:
+    with open(os.path.join(data_dir, 'hollywood.json'), 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def load_thea():
+def load_thea(data_dir='data'):
     """Load thea.json data"""
-    with open('data/thea.json', 'r', encoding='utf-8') as f:
+    with open(os.path.join(data_dir, 'thea.json'), 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def get_nav_items(lang, current_page, photos):
-    """Generate navigation items from photos array (sorted alphabetically)"""
+def load_catalog_index(path=CATALOG_INDEX_PATH):
+    """Load the cached records of the per-entry data files"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (TypeError, FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_catalog_index(index, path=CATALOG_INDEX_PATH):
+    """Write the catalog index for the next build"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+def entry_record(path, entry, previous=None):
+    """Return the compact record of a per-entry data file
+
+    It stands in for the entry everywhere but rendering: the titles feed the
+    navigation, the photo paths the asset index, the content hash the page's
+    change detection and terms_<lang> (search_terms() of search_text(), no
+    stopwords removed) the search index. The terms of previous, a record of
+    the same content, are reused.
+    """
+    digest = hash_inputs(entry)
+    record = {
+        'entry_file': path,
+        'hash': digest,
+        'title_en': entry['title_en'],
+        'title_de': entry['title_de'],
+        'photos': [{'photo': photo['photo']} for photo in entry.get('photos', [])],
+    }
+    if entry.get('imdb'):
+        record['imdb'] = entry['imdb']
+    for lang in LANGUAGES:
+        if previous and previous['hash'] == digest and f'terms_{lang}' in previous:
+            record[f'terms_{lang}'] = previous[f'terms_{lang}']
+        else:
+            record[f'terms_{lang}'] = sorted(search_terms(search_text(entry, lang), ()))
+    return record
+
+def load_entry_records(directory, cached, index):
+    """Return the records of the per-entry data files in directory, sorted by file name
+
+    Files whose size and mtime match cached (the previous catalog index) are
+    not read, unless the entry was made with other CATALOG_PARAMS. Every
+    record is added to index.
+    """
+    if not os.path.isdir(directory):
+        return []
+    records = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(directory, name)
+        st = os.stat(path)
+        entry = cached.get(path)
+        current = entry and entry.get('params') == CATALOG_PARAMS
+        if not current or entry['mtime'] != st.st_mtime_ns or entry['size'] != st.st_size:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = entry_record(path, json.load(f), entry['record'] if current else None)
+            entry = {'mtime': st.st_mtime_ns, 'size': st.st_size, 'params': CATALOG_PARAMS, 'record': record}
+        index[path] = entry
+        records.append(entry['record'])
+    return records
+
+def entry_data(data):
+    """Return the full data of a page, reading per-entry data files on demand"""
+    if 'entry_file' not in data:
+        return data
+    with open(data['entry_file'], 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_site(data_dir='data', catalog_path=CATALOG_INDEX_PATH):
+    """Load the data files; returns (pages, photos, movies, thea)
+
+    pages lists (page_name, data) for every page rendered from template.html.
+    Entries of data/photos/*.json and data/movies/*.json (one entry per file)
+    follow those of photos.json and movies.json as entry_record()s; pass them
+    through entry_data() for the full entry. The catalog index at
+    catalog_path (None: no cache) is only rewritten when it changed.
+    """
+    cached = load_catalog_index(catalog_path)
+    index = {}
+    photos = load_photos(data_dir) + load_entry_records(os.path.join(data_dir, 'photos'), cached, index)
+    movies = load_movies(data_dir) + load_entry_records(os.path.join(data_dir, 'movies'), cached, index)
+    if catalog_path and index != cached:
+        save_catalog_index(index, catalog_path)
+    hollywood = load_hollywood(data_dir)
+    thea = load_thea(data_dir)
+
+    pages = []
+    # Create life and career pages
+    for page_name in ['life', 'career']:
+        print(f"  Processing {page_name}.json...")
+        with open(os.path.join(data_dir, f'{page_name}.json'), 'r', encoding='utf-8') as f:
+            pages.append((page_name, json.load(f)))
+
+    # Create hollywood page
+    print(f"  Processing hollywood.json...")
+    pages.append(('hollywood', hollywood))
+
+    # Create photo pages from photos.json
+    print(f"  Processing photos.json...")
+    for item in photos:
+        pages.append((slugify(item['title_en']), item))
+
+    # Create movie pages from movies.json
+    print(f"  Processing movies.json...")
+    for item in movies:
+        pages.append(('movie-' + slugify(item['title_en']), item))
+
+    if index:
+        print(f"  {len(index)} per-entry data files")
+    counts = collections.Counter(page_name for page_name, _ in pages)
+    duplicates = sorted(page_name for page_name, count in counts.items() if count > 1)
+    if duplicates:
+        raise ValueError('Entries with the same page name: ' + ', '.join(duplicates))
+    return pages, photos, movies, thea
+
+def build_nav(lang, items, prefix=''):
+    """Generate navigation items for photos or movies (sorted alphabetically)
+
+    The list is built once per language with no active item; mark_active()
+    highlights the current page.
+    """
     nav_items = []
-    sorted_photos = sorted(photos, key=lambda x: x[f'title_{lang}'].lower())
-    for item in sorted_photos:
-        page_name = slugify(item['title_en'])
+    sorted_items = sorted(items, key=lambda x: x[f'title_{lang}'].lower())
+    for item in sorted_items:
+        page_name = prefix + slugify(item['title_en'])
         title = item[f'title_{lang}']
-        active_class = 'font-semibold bg-gray-200 dark:bg-gray-800 dark:text-gray-100' if current_page == page_name else ''
-        nav_items.append(f'<li><a href="{page_name}.html" class="py-0 text-sm ml-4 nav-link {active_class}">{title}</a></li>')
+        nav_items.append(f'<li><a href="{page_name}.html" class="py-0 text-sm ml-4 nav-link ">{title}</a></li>')
 
     return '\n                        '.join(nav_items)
 
+def build_navs(photos, movies, languages=LANGUAGES):
+    """Prebuild the photo and movie navigation of every language"""
+    return {lang: (build_nav(lang, photos), build_nav(lang, movies, 'movie-')) for lang in languages}
+
+def mark_active(nav_items, current_page):
+    """Highlight the link to current_page in prebuilt navigation items"""
+    link = f'<a href="{current_page}.html" class="py-0 text-sm ml-4 nav-link '
+    return nav_items.replace(link + '">', link + NAV_ACTIVE_CLASS + '">')
+
+def get_nav_items(lang, current_page, photos):
+    """Generate navigation items from photos array (sorted alphabetically)"""
+    return mark_active(build_nav(lang, photos), current_page)
+
 def get_movie_nav_items(lang, current_page, movies):
     """Generate navigation items from movies array (sorted alphabetically)"""
-    nav_items = []
-    sorted_movies = sorted(movies, key=lambda x: x[f'title_{lang}'].lower())
-    for item in sorted_movies:
-        page_name = 'movie-' + slugify(item['title_en'])
-        title = item[f'title_{lang}']
-        active_class = 'font-semibold bg-gray-200 dark:bg-gray-800 dark:text-gray-100' if current_page == page_name else ''
-        nav_items.append(f'<li><a href="{page_name}.html" class="py-0 text-sm ml-4 nav-link {active_class}">{title}</a></li>')
+    return mark_active(build_nav(lang, movies, 'movie-'), current_page)
 
-    return '\n                        '.join(nav_items)
+def fold_text(text):
+    """Fold text for search the way slugify() does: NFKD, ASCII only, lowercase"""
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
 
-def create_page(lang, page_name, data, template, photos, movies, css_version, hollywood=None):
-    """Generate HTML page from data"""
-    labels = {
-        'en': {
-            'life': 'Biography',
-            'career': 'Career',
-            'hollywood': 'Hollywood',
-            'photography': 'Photography',
-            'movies': 'Movies',
-            'photographer': 'Photographer',
-            'photolabel': 'Ina in her 20\'s in Berlin'
-        },
-        'de': {
-            'life': 'Biographie',
-            'career': 'Karriere',
-            'hollywood': 'Hollywood',
-            'photography': 'Fotografie',
-            'movies': 'Filme',
-            'photographer': 'Fotografin',
-            'photolabel': 'Ina in ihren 20\'er Jahren in Berlin'
-        }
+def search_terms(text, stopwords):
+    """Return the set of indexable terms of a text (HTML tags removed)"""
+    words = re.findall(r'[a-z0-9]+', fold_text(re.sub(r'<[^>]+>', ' ', text)))
+    return {word for word in words if len(word) >= SEARCH_MIN_TERM and word not in stopwords}
+
+def search_text(data, lang):
+    """Return the indexed text of a page besides its title: its descriptions and those of its photos and events"""
+    texts = [data.get(f'description_{lang}') or '']
+    texts += [photo.get(f'description_{lang}') or '' for photo in data.get('photos', [])]
+    texts += [event.get(f'description_{lang}') or '' for event in data.get('events', [])]
+    return ' '.join(texts)
+
+def build_search_index(lang, pages):
+    """Return {file name: data} of a language's search index
+
+    Documents are numbered alphabetically by title. index.json holds the
+    stopwords, minimum term length and document count, docs-<n>.json the
+    [page name, title] of SEARCH_DOCS_PER_FILE documents each, and every
+    other file is the shard of one first character mapping its terms to
+    postings. A posting is number * 2 + 1 when the term is in the title
+    (+ 0 otherwise), and the ascending postings are delta-encoded. A query only loads the shards of
+    its terms' first characters and the document files of its top results.
+    Per-entry records carry their terms, so their data files are not read.
+    """
+    stopwords = search_terms(SEARCH_STOPWORDS[lang], ())
+    documents = []
+    for page_name, data in pages:
+        # career.html is not linked from the navigation
+        if page_name == 'career':
+            continue
+        title = data[f'title_{lang}']
+        if f'terms_{lang}' in data:
+            terms = set(data[f'terms_{lang}']) - stopwords
+        else:
+            terms = search_terms(search_text(data, lang), stopwords)
+        documents.append((fold_text(title), page_name, title, terms))
+    documents.sort()
+
+    shards = {}
+    for number, (_, _, title, terms) in enumerate(documents):
+        title_terms = search_terms(title, stopwords)
+        for term in title_terms | terms:
+            shards.setdefault(term[0], {}).setdefault(term, []).append(number * 2 + (term in title_terms))
+
+    docs = [[page_name, title] for _, page_name, title, _ in documents]
+    index = {'index.json': {'count': len(docs), 'per_file': SEARCH_DOCS_PER_FILE, 'min_term': SEARCH_MIN_TERM,
+                            'stopwords': sorted(stopwords)}}
+    for start in range(0, len(docs), SEARCH_DOCS_PER_FILE):
+        index[f'docs-{start // SEARCH_DOCS_PER_FILE}.json'] = docs[start:start + SEARCH_DOCS_PER_FILE]
+    for char, terms in sorted(shards.items()):
+        index[f'{char}.json'] = {term: [n - p for n, p in zip(postings, [0] + postings)]
+                                 for term, postings in sorted(terms.items())}
+    return index
+
+LABELS = {
+    'en': {
+        'life': 'Biography',
+        'career': 'Career',
+        'hollywood': 'Hollywood',
+        'photography': 'Photography',
+        'movies': 'Movies',
+        'photographer': 'Photographer',
+        'photolabel': 'Ina in her 20\'s in Berlin',
+        'search': 'Search',
+        'search_empty': 'No results'
+    },
+    'de': {
+        'life': 'Biographie',
+        'career': 'Karriere',
+        'hollywood': 'Hollywood',
+        'photography': 'Fotografie',
+        'movies': 'Filme',
+        'photographer': 'Fotografin',
+        'photolabel': 'Ina in ihren 20\'er Jahren in Berlin',
+        'search': 'Suchen',
+        'search_empty': 'Keine Treffer'
     }
+}
+
+@functools.lru_cache(maxsize=None)
+def compile_template(template):
+    """Split a template into (literal, slot) segments once
+
+    Slots are written as {{ name }}, so everything else - including the
+    braces of inline JavaScript - is copied verbatim.
+    """
+    parts = SLOT_PATTERN.split(template)
+    # split() alternates literal text and slot names; the last literal has no slot
+    return tuple(zip(parts[::2], parts[1::2] + [None]))
+
+def render_template(compiled, write, values):
+    """Write a compiled template, streaming list values fragment by fragment"""
+    for literal, slot in compiled:
+        write(literal)
+        if slot is not None:
+            value = values[slot]
+            if isinstance(value, list):
+                for fragment in value:
+                    write(fragment)
+            else:
+                write(str(value))
+
+def render_life(out, lang, data, assets):
+    """Append the content of the life page (timeline) to out"""
+    out.append('<div class="flex flex-col-reverse mb-8 md:flex-row md:items-start md:gap-8">\n')
+    out.append('    <div class="flex-1">\n')
+    out.append(f'        <h1 class="mb-6 text-3xl font-bold text-gray-900 md:text-5xl dark:text-gray-100">{data[f"title_{lang}"]}</h1>\n')
+    out.append(f'        <p class="text-lg leading-relaxed text-gray-700 dark:text-gray-300">{nl2br(data[f"description_{lang}"])}</p>\n')
+    out.append('    </div>\n')
+    out.append('    <div class="w-3/4 mb-6 sm:w-1/2 md:w-1/3 md:mb-0 shrink-0">\n')
+    out.append(f'        {render_img("assets/images/Ina.png", "Ina Berneis", assets, SIZES_PORTRAIT, "w-full h-auto rounded-lg shadow-lg", lazy=False)}\n')
+    out.append(f'        <div class="mt-1 text-xs text-center">{LABELS[lang]["photolabel"]}</div>\n')
+    out.append('    </div>\n')
+    out.append('</div>\n')
+    out.append('<div class="space-y-0">\n')
+    for event in data["events"]:
+        out.append('    <div class="timeline-item">\n')
+        out.append(f'        <h2 class="mb-3 text-xl font-bold text-gray-900 md:text-2xl dark:text-gray-100">{event["date"]}</h2>\n')
+        out.append(f'        <p class="mb-4 leading-relaxed text-gray-700 dark:text-gray-300">{nl2br(event[f"description_{lang}"])}</p>\n')
+        if "photo" in event:
+            alt = f'Photo from {event["date"]}'
+            out.append('        <div class="w-32 md:w-48 photo-container">\n')
+            out.append(f'            {render_img(event["photo"], alt, assets, SIZES_TIMELINE)}\n')
+            out.append('        </div>\n')
+        out.append('    </div>\n')
+    out.append('</div>')
+
+def render_career(out, lang, data):
+    """Append the content of the career page to out"""
+    out.append(f'<h1 class="mb-6 text-3xl font-bold text-gray-900 md:text-5xl dark:text-gray-100">{data[f"title_{lang}"]}</h1>\n')
+    out.append('<div class="prose prose-lg dark:prose-invert max-w-none">\n')
+    # Iterate over all key/value pairs in content section
+    for key, value in data[f"content_{lang}"].items():
+        # Use the key as the header (capitalize first letter of each word)
+        header = key.replace('_', ' ').title()
+        out.append(f'    <h2 class="mt-8 mb-4 text-2xl font-bold text-gray-900 md:text-3xl dark:text-gray-100">{header}</h2>\n')
+        out.append(f'    <p class="mb-8 leading-relaxed text-gray-700 dark:text-gray-300">{nl2br(value)}</p>\n')
+    out.append('</div>')
 
-    # Create life page with timeline
+def render_movie(out, lang, data, assets):
+    """Append the content of a movie page to out"""
+    out.append('<div class="flex items-center gap-3 mb-6">\n')
+    out.append(f'    <h1 class="text-3xl font-bold text-gray-900 md:text-5xl dark:text-gray-100">{data[f"title_{lang}"]}</h1>\n')
+    if "link" in data and data["link"]:
+        out.append(f'    <a href="{data["link"]}" target="_blank" rel="noopener noreferrer" class="text-gray-500 transition-colors hover:text-gray-700 dark:text-gray-400 dark:hover:text-gray-200" title="More information">\n')
+        out.append('        <svg class="w-8 h-8" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M13 16h-1v-4h-1m1-4h.01M21 12a9 9 0 11-18 0 9 9 0 0118 0z"></path></svg>\n')
+        out.append('    </a>\n')
+    out.append('</div>\n')
+    if "imdb" in data and data["imdb"]:
+        out.append(f'<a href="{data["imdb"]}" target="_blank" rel="noopener noreferrer" class="inline-block mb-4">\n')
+        out.append(f'    <img src="{asset_url("assets/images/imdb.svg", assets)}" alt="IMDB" class="h-8">\n')
+        out.append('</a>\n')
+    else:
+        out.append('<div class="mb-12"></div>\n')
+    out.append(f'<p class="mb-6 text-lg leading-relaxed text-gray-700 dark:text-gray-300">{nl2br(data[f"description_{lang}"])}</p>\n')
+    out.append('<div class="grid grid-cols-1 gap-8 lg:grid-cols-2">\n')
+    for index, photo in enumerate(data["photos"]):
+        out.append('    <div class="space-y-4">\n')
+        out.append('        <div class="photo-container">\n')
+        out.append(f'            {render_img(photo["photo"], data[f"title_{lang}"], assets, SIZES_GRID, lazy=index >= EAGER_IMAGES)}\n')
+        out.append('        </div>\n')
+        if f"description_{lang}" in photo:
+            out.append(f'        <p class="text-sm italic text-gray-600 dark:text-gray-400">{nl2br(photo[f"description_{lang}"])}</p>\n')
+        out.append('    </div>\n')
+    out.append('</div>')
+
+def render_photo_item(photo, alt, lang, assets, lazy):
+    """Return a photo grid item with its caption"""
+    item = ['    <div class="space-y-4">\n',
+            '        <div class="photo-container">\n',
+            f'            {render_img(photo["photo"], alt, assets, SIZES_GRID, lazy=lazy)}\n',
+            '        </div>\n']
+    if f"description_{lang}" in photo:
+        item.append(f'        <p class="text-sm italic text-gray-600 dark:text-gray-400">{nl2br(photo[f"description_{lang}"])}</p>\n')
+    item.append('    </div>\n')
+    return ''.join(item)
+
+def render_photography(out, lang, data, assets, page_name='', gallery_batch=GALLERY_BATCH):
+    """Append the content of a photography page (and hollywood) to out
+
+    Returns the HTML of the gallery batches that are loaded on scroll
+    (empty unless the page has more than gallery_batch photos; 0 disables
+    batching).
+    """
+    out.append('<div class="flex items-center gap-3 mb-6">\n')
+    out.append(f'    <h1 class="text-3xl font-bold text-gray-900 md:text-5xl dark:text-gray-100">{data[f"title_{lang}"]}</h1>\n')
+    if "link" in data and data["link"]:
+        out.append(f'    <a href="{data["link"]}" target="_blank" rel="noopener noreferrer" class="text-gray-500 transition-colors hover:text-gray-700 dark:text-gray-400 dark:hover:text-gray-200" title="More information">\n')
+        out.append('        <svg class="w-8 h-8" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M13 16h-1v-4h-1m1-4h.01M21 12a9 9 0 11-18 0 9 9 0 0118 0z"></path></svg>\n')
+        out.append('    </a>\n')
+    out.append('</div>\n')
+    out.append(f'<p class="mb-12 text-lg leading-relaxed text-gray-700 dark:text-gray-300">{nl2br(data[f"description_{lang}"])}</p>\n')
+    if len(data["photos"]) == 1:
+        # Single image: center it under the description
+        photo = data["photos"][0]
+        out.append('<div class="flex justify-center">\n')
+        out.append('    <div class="space-y-4 w-full lg:w-1/2">\n')
+        out.append('        <div class="photo-container">\n')
+        out.append(f'            {render_img(photo["photo"], data[f"title_{lang}"], assets, SIZES_GRID, lazy=False)}\n')
+        out.append('        </div>\n')
+        if f"description_{lang}" in photo:
+            out.append(f'        <p class="text-sm italic text-gray-600 dark:text-gray-400">{nl2br(photo[f"description_{lang}"])}</p>\n')
+        out.append('    </div>\n')
+        out.append('</div>')
+    else:
+        # Multiple images: use grid layout
+        photos = data["photos"]
+        title = data[f"title_{lang}"]
+        if gallery_batch and len(photos) > gallery_batch:
+            batches = [''.join(render_photo_item(photo, title, lang, assets, lazy=True)
+                               for photo in photos[start:start + gallery_batch])
+                       for start in range(gallery_batch, len(photos), gallery_batch)]
+            photos = photos[:gallery_batch]
+            out.append(f'<div class="grid grid-cols-1 gap-8 lg:grid-cols-2" data-gallery="gallery/{page_name}/" '
+                       f'data-batches="{len(batches)}">\n')
+        else:
+            batches = []
+            out.append('<div class="grid grid-cols-1 gap-8 lg:grid-cols-2">\n')
+        for index, photo in enumerate(photos):
+            out.append(render_photo_item(photo, title, lang, assets, lazy=index >= EAGER_IMAGES))
+        out.append('</div>')
+        if batches:
+            out.append('\n<div id="gallery-sentinel"></div>')
+        return batches
+    return []
+
+def create_page(lang, page_name, data, template, photos, movies, css_version, hollywood=None, assets=None,
+                navs=None, writer=None, gallery_batch=GALLERY_BATCH):
+    """Generate HTML page from data
+
+    The page body is rendered into a list of fragments that is streamed into
+    the compiled template. navs are the prebuilt navigation lists from
+    build_navs(); without them the navigation is generated for this page alone.
+    The page, its fragment and gallery batches go to writer (default: public/).
+    """
+    writer = writer or DirectoryWriter('public')
+    content = []
+    batches = []
     if page_name == 'life':
-        content = '<div class="flex flex-col-reverse mb-8 md:flex-row md:items-start md:gap-8">\n'
-        content += '    <div class="flex-1">\n'
-        content += f'        <h1 class="mb-6 text-3xl font-bold text-gray-900 md:text-5xl dark:text-gray-100">{data[f"title_{lang}"]}</h1>\n'
-        content += f'        <p class="text-lg leading-relaxed text-gray-700 dark:text-gray-300">{nl2br(data[f"description_{lang}"])}</p>\n'
-        content += '    </div>\n'
-        content += '    <div class="w-3/4 mb-6 sm:w-1/2 md:w-1/3 md:mb-0 shrink-0">\n'
-        content += '        <img src="../assets/images/Ina.png" alt="Ina Berneis" class="w-full h-auto rounded-lg shadow-lg">\n'
-        content += f'        <div class="mt-1 text-xs text-center">{labels[lang]["photolabel"]}</div>\n'
-        content += '    </div>\n'
-        content += '</div>\n'
-        content += '<div class="space-y-0">\n'
-        for event in data["events"]:
-            content += '    <div class="timeline-item">\n'
-            content += f'        <h2 class="mb-3 text-xl font-bold text-gray-900 md:text-2xl dark:text-gray-100">{event["date"]}</h2>\n'
-            content += f'        <p class="mb-4 leading-relaxed text-gray-700 dark:text-gray-300">{nl2br(event[f"description_{lang}"])}</p>\n'
-            if "photo" in event:
-                content += '        <div class="w-32 md:w-48 photo-container">\n'
-                content += f'            <img src="../{event["photo"]}" alt="Photo from {event["date"]}" class="w-full h-auto">\n'
-                content += '        </div>\n'
-            content += '    </div>\n'
-        content += '</div>'
-
-    # Create career page
+        render_life(content, lang, data, assets)
     elif page_name == 'career':
-        content = f'<h1 class="mb-6 text-3xl font-bold text-gray-900 md:text-5xl dark:text-gray-100">{data[f"title_{lang}"]}</h1>\n'
-        content += '<div class="prose prose-lg dark:prose-invert max-w-none">\n'
-        # Iterate over all key/value pairs in content section
-        for key, value in data[f"content_{lang}"].items():
-            # Use the key as the header (capitalize first letter of each word)
-            header = key.replace('_', ' ').title()
-            content += f'    <h2 class="mt-8 mb-4 text-2xl font-bold text-gray-900 md:text-3xl dark:text-gray-100">{header}</h2>\n'
-            content += f'    <p class="mb-8 leading-relaxed text-gray-700 dark:text-gray-300">{nl2br(value)}</p>\n'
-        content += '</div>'
-
-    # Create movie pages
+        render_career(content, lang, data)
     elif page_name.startswith('movie-'):
-        content = '<div class="flex items-center gap-3 mb-6">\n'
-        content += f'    <h1 class="text-3xl font-bold text-gray-900 md:text-5xl dark:text-gray-100">{data[f"title_{lang}"]}</h1>\n'
-        if "link" in data and data["link"]:
-            content += f'    <a href="{data["link"]}" target="_blank" rel="noopener noreferrer" class="text-gray-500 transition-colors hover:text-gray-700 dark:text-gray-400 dark:hover:text-gray-200" title="More information">\n'
-            content += '        <svg class="w-8 h-8" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M13 16h-1v-4h-1m1-4h.01M21 12a9 9 0 11-18 0 9 9 0 0118 0z"></path></svg>\n'
-            content += '    </a>\n'
-        content += '</div>\n'
-        if "imdb" in data and data["imdb"]:
-            content += f'<a href="{data["imdb"]}" target="_blank" rel="noopener noreferrer" class="inline-block mb-4">\n'
-            content += '    <img src="../assets/images/imdb.svg" alt="IMDB" class="h-8">\n'
-            content += '</a>\n'
-        else:
-            content += '<div class="mb-12"></div>\n'
-        content += f'<p class="mb-6 text-lg leading-relaxed text-gray-700 dark:text-gray-300">{nl2br(data[f"description_{lang}"])}</p>\n'
-        content += '<div class="grid grid-cols-1 gap-8 lg:grid-cols-2">\n'
-        for photo in data["photos"]:
-            content += '    <div class="space-y-4">\n'
-            content += '        <div class="photo-container">\n'
-            content += f'            <img src="../{photo["photo"]}" alt="{data[f"title_{lang}"]}" class="w-full h-auto">\n'
-            content += '        </div>\n'
-            if f"description_{lang}" in photo:
-                content += f'        <p class="text-sm italic text-gray-600 dark:text-gray-400">{nl2br(photo[f"description_{lang}"])}</p>\n'
-            content += '    </div>\n'
-        content += '</div>'
-
-    # Create photography pages
+        render_movie(content, lang, data, assets)
     else:
-        content = '<div class="flex items-center gap-3 mb-6">\n'
-        content += f'    <h1 class="text-3xl font-bold text-gray-900 md:text-5xl dark:text-gray-100">{data[f"title_{lang}"]}</h1>\n'
-        if "link" in data and data["link"]:
-            content += f'    <a href="{data["link"]}" target="_blank" rel="noopener noreferrer" class="text-gray-500 transition-colors hover:text-gray-700 dark:text-gray-400 dark:hover:text-gray-200" title="More information">\n'
-            content += '        <svg class="w-8 h-8" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M13 16h-1v-4h-1m1-4h.01M21 12a9 9 0 11-18 0 9 9 0 0118 0z"></path></svg>\n'
-            content += '    </a>\n'
-        content += '</div>\n'
-        content += f'<p class="mb-12 text-lg leading-relaxed text-gray-700 dark:text-gray-300">{nl2br(data[f"description_{lang}"])}</p>\n'
-        if len(data["photos"]) == 1:
-            # Single image: center it under the description
-            photo = data["photos"][0]
-            content += '<div class="flex justify-center">\n'
-            content += '    <div class="space-y-4 w-full lg:w-1/2">\n'
-            content += '        <div class="photo-container">\n'
-            content += f'            <img src="../{photo["photo"]}" alt="{data[f"title_{lang}"]}" class="w-full h-auto">\n'
-            content += '        </div>\n'
-            if f"description_{lang}" in photo:
-                content += f'        <p class="text-sm italic text-gray-600 dark:text-gray-400">{nl2br(photo[f"description_{lang}"])}</p>\n'
-            content += '    </div>\n'
-            content += '</div>'
-        else:
-            # Multiple images: use grid layout
-            content += '<div class="grid grid-cols-1 gap-8 lg:grid-cols-2">\n'
-            for photo in data["photos"]:
-                content += '    <div class="space-y-4">\n'
-                content += '        <div class="photo-container">\n'
-                content += f'            <img src="../{photo["photo"]}" alt="{data[f"title_{lang}"]}" class="w-full h-auto">\n'
-                content += '        </div>\n'
-                if f"description_{lang}" in photo:
-                    content += f'        <p class="text-sm italic text-gray-600 dark:text-gray-400">{nl2br(photo[f"description_{lang}"])}</p>\n'
-                content += '    </div>\n'
-            content += '</div>'
+        batches = render_photography(content, lang, data, assets, page_name, gallery_batch)
 
     # Navigation items
-    nav_items = get_nav_items(lang, page_name, photos)
-    movie_nav_items = get_movie_nav_items(lang, page_name, movies)
+    if navs:
+        nav_items = mark_active(navs[lang][0], page_name)
+        movie_nav_items = mark_active(navs[lang][1], page_name)
+    else:
+        nav_items = get_nav_items(lang, page_name, photos)
+        movie_nav_items = get_movie_nav_items(lang, page_name, movies)
 
     # Active states
     life_active = 'font-semibold bg-gray-200 dark:bg-gray-800 dark:text-gray-100' if page_name == 'life' else ''
@@ -193,14 +1833,15 @@ def create_page(lang, page_name, data, template, photos, movies, css_version, ho
     lang_en_active = 'bg-gray-900 dark:bg-gray-100 text-white dark:text-gray-900' if lang == 'en' else 'text-gray-600 dark:text-gray-400 hover:bg-gray-200 dark:hover:bg-gray-800'
     lang_de_active = 'bg-gray-900 dark:bg-gray-100 text-white dark:text-gray-900' if lang == 'de' else 'text-gray-600 dark:text-gray-400 hover:bg-gray-200 dark:hover:bg-gray-800'
 
-    with open(f'public/{lang}/{page_name}.html', 'w', encoding='utf-8') as f:
-        f.write(template.format(
+    with writer.open(f'{lang}/{page_name}.html') as f:
+        render_template(compile_template(template), f.write, dict(
             lang=lang,
             title=data[f"title_{lang}"],
             content=content,
             page_name=page_name,
             css_path="../assets/css/",
             css_version=css_version,
+            js_url=asset_url(JS_ASSET, assets),
             nav_items=nav_items,
             movie_nav_items=movie_nav_items,
             life_active=life_active,
@@ -208,21 +1849,134 @@ def create_page(lang, page_name, data, template, photos, movies, css_version, ho
             hollywood_active=hollywood_active,
             lang_en_active=lang_en_active,
             lang_de_active=lang_de_active,
-            life_label=labels[lang]['life'],
-            career_label=labels[lang]['career'],
-            hollywood_label=labels[lang]['hollywood'],
-            photography_label=labels[lang]['photography'],
-            movies_label=labels[lang]['movies'],
-            photographer_label=labels[lang]['photographer']
+            life_label=LABELS[lang]['life'],
+            career_label=LABELS[lang]['career'],
+            hollywood_label=LABELS[lang]['hollywood'],
+            photography_label=LABELS[lang]['photography'],
+            movies_label=LABELS[lang]['movies'],
+            photographer_label=LABELS[lang]['photographer'],
+            search_label=LABELS[lang]['search'],
+            search_empty_label=LABELS[lang]['search_empty'],
+            nav_active_class=NAV_ACTIVE_CLASS
         ))
 
-def create_thea_page(data, css_version):
-    """Generate the standalone thea subsite page"""
+    # The same content for client-side navigation from other pages
+    with writer.open(fragment_path(f'{lang}/{page_name}.html')) as f:
+        json.dump({'page': page_name, 'lang': lang, 'title': data[f"title_{lang}"], 'content': ''.join(content)},
+                  f, ensure_ascii=False, separators=(',', ':'))
+
+    directory = gallery_dir(f'{lang}/{page_name}.html')
+    for number, html in enumerate(batches, 1):
+        with writer.open(f'{directory}/{number}.json') as f:
+            json.dump({'html': html}, f, ensure_ascii=False, separators=(',', ':'))
+
+# Timings and counts of the current build_site() run (see --profile)
+_profile = {}
+
+@contextlib.contextmanager
+def phase(name):
+    """Add the wall time of the enclosed block to a build phase"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases = _profile.setdefault('phases', {})
+        phases[name] = phases.get(name, 0) + time.perf_counter() - start
+
+def write_profile(path, total_seconds):
+    """Write the profile of the last build as JSON and print a summary"""
+    pages = _profile.get('pages', {})
+    report = {
+        'total_seconds': round(total_seconds, 4),
+        'phases': {name: round(seconds, 4) for name, seconds in _profile.get('phases', {}).items()},
+        'pages': {output: {'seconds': round(seconds, 5), 'bytes': size}
+                  for output, (seconds, size) in sorted(pages.items())},
+        'counts': _profile.get('counts', {}),
+    }
+    if resource is not None:
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        scale = 1024 if sys.platform == 'darwin' else 1
+        report['peak_memory_kb'] = {
+            'build': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale,
+            'workers': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale,
+        }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Build profile ({total_seconds:.3f}s, written to {path})")
+    print("  Slowest phases:")
+    for name, seconds in sorted(report['phases'].items(), key=lambda x: -x[1]):
+        print(f"    {name:<20} {seconds:8.3f}s")
+    print("  Slowest pages:")
+    for output, (seconds, size) in sorted(pages.items(), key=lambda x: -x[1][0])[:10]:
+        print(f"    {output:<60} {seconds:8.4f}s {size / 1024:8.1f} KB")
+    counts = ', '.join(f'{value} {name}' for name, value in report['counts'].items())
+    total_bytes = sum(size for _, size in pages.values())
+    print(f"  {counts}, {total_bytes / 1024:.1f} KB written")
+    if 'peak_memory_kb' in report:
+        print(f"  Peak memory: {report['peak_memory_kb']['build'] / 1024:.1f} MB "
+              f"(workers {report['peak_memory_kb']['workers'] / 1024:.1f} MB)")
+
+# Shared render inputs of the current process, set by init_render_worker()
+_render_state = {}
+
+def init_render_worker(template, photos, movies, css_version, assets, pages, navs, writer,
+                       gallery_batch=GALLERY_BATCH):
+    """Keep the inputs shared by all pages, once per (worker) process"""
+    _render_state.update(template=template, photos=photos, movies=movies, css_version=css_version,
+                         assets=assets, pages=pages, navs=navs, writer=writer, gallery_batch=gallery_batch)
+
+def render_job(lang, page_name):
+    """Render a single page from the shared render inputs
+
+    Returns the render time in seconds and the size of the written file.
+    """
+    state = _render_state
+    start = time.perf_counter()
+    create_page(lang, page_name, entry_data(state['pages'][page_name]), state['template'], state['photos'],
+                state['movies'], state['css_version'], assets=state['assets'], navs=state['navs'],
+                writer=state['writer'], gallery_batch=state['gallery_batch'])
+    return time.perf_counter() - start, state['writer'].size(f'{lang}/{page_name}.html')
+
+def render_pages(jobs, workers, shared):
+    """Render (lang, page_name) jobs, across a process pool if workers > 1
+
+    shared are the init_render_worker() arguments. Pages are independent, so
+    the output is identical to a serial build. Returns (timings, failures):
+    {path: (seconds, bytes)} for rendered pages and {path: error} for pages
+    that failed to render.
+    """
+    timings = {}
+    failures = {}
+    if workers <= 1:
+        init_render_worker(*shared)
+        for lang, page_name in jobs:
+            path = f'{lang}/{page_name}.html'
+            try:
+                timings[path] = render_job(lang, page_name)
+            except Exception as e:
+                failures[path] = f'{type(e).__name__}: {e}'
+        return timings, failures
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=init_render_worker,
+                                                initargs=shared) as pool:
+        futures = {pool.submit(render_job, lang, page_name): f'{lang}/{page_name}.html'
+                   for lang, page_name in jobs}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                timings[futures[future]] = future.result()
+            except Exception as e:
+                failures[futures[future]] = f'{type(e).__name__}: {e}'
+    return timings, failures
+
+def create_thea_page(data, css_version, assets=None, writer=None):
+    """Generate the standalone thea subsite page (written to writer, default: public/)"""
     # Generate photo grid HTML
     photos_html = ''
-    for photo in data["photos"]:
+    for index, photo in enumerate(data["photos"]):
         photos_html += '                <div class="photo-container">\n'
-        photos_html += f'                    <img src="images/{os.path.basename(photo["photo"])}" alt="Thea" class="w-full h-auto">\n'
+        photos_html += f'                    {render_img(photo["photo"], "Thea", assets, SIZES_GRID, lazy=index >= EAGER_IMAGES)}\n'
         photos_html += '                </div>\n'
 
     html = f'''<!DOCTYPE html>
@@ -442,83 +2196,25 @@ def create_thea_page(data, css_version):
 </html>'''
 
     # Write the thea page
-    os.makedirs('public/thea', exist_ok=True)
-    with open('public/thea/index.html', 'w', encoding='utf-8') as f:
+    with (writer or DirectoryWriter('public')).open('thea/index.html') as f:
         f.write(html)
 
-def main():
-    """Main function to build the static site"""
-    print("Building Ina Berneis website...")
-
-    # Generate cache-buster version based on current timestamp
-    css_version = int(time.time())
-
-    # Create output directories
-    os.makedirs('public/en', exist_ok=True)
-    os.makedirs('public/de', exist_ok=True)
-    os.makedirs('public/assets/css', exist_ok=True)
-    os.makedirs('public/assets/images', exist_ok=True)
-
-    # Read template
-    with open('template.html', 'r', encoding='utf-8') as f:
-        template = f.read()
-
-    # Load photos, movies, and hollywood
-    photos = load_photos()
-    movies = load_movies()
-    hollywood = load_hollywood()
-
-    # Create life and career pages
-    for page_name in ['life', 'career']:
-        print(f"  Processing {page_name}.json...")
-        with open(f'data/{page_name}.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            create_page('en', page_name, data, template, photos, movies, css_version)
-            create_page('de', page_name, data, template, photos, movies, css_version)
-
-    # Create hollywood page
-    print(f"  Processing hollywood.json...")
-    create_page('en', 'hollywood', hollywood, template, photos, movies, css_version)
-    create_page('de', 'hollywood', hollywood, template, photos, movies, css_version)
-
-    # Create photo pages from photos.json
-    print(f"  Processing photos.json...")
-    for item in photos:
-        page_name = slugify(item['title_en'])
-        print(f"    Creating {page_name} pages...")
-        create_page('en', page_name, item, template, photos, movies, css_version)
-        create_page('de', page_name, item, template, photos, movies, css_version)
-
-    # Create movie pages from movies.json
-    print(f"  Processing movies.json...")
-    for item in movies:
-        page_name = 'movie-' + slugify(item['title_en'])
-        print(f"    Creating {page_name} pages...")
-        create_page('en', page_name, item, template, photos, movies, css_version)
-        create_page('de', page_name, item, template, photos, movies, css_version)
-
-    # Create thea subsite
-    print("  Processing thea.json...")
-    thea = load_thea()
-    create_thea_page(thea, css_version)
-
-    # Create index page with language detection
-    print("  Creating index page...")
-    with open('public/index.html', 'w', encoding='utf-8') as f:
-        f.write('''<!DOCTYPE html>
+def render_index_page(assets):
+    """Return the HTML of public/index.html, which redirects to the reader's language"""
+    return f'''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Ina Berneis - Photographer</title>
-    <link href="assets/css/style.css" rel="stylesheet">
+    <link href="{asset_url(CSS_ASSET, assets, prefix='')}" rel="stylesheet">
     <script>
         const userLang = navigator.language || navigator.userLanguage;
-        if (userLang.startsWith('de')) {
+        if (userLang.startsWith('de')) {{
             window.location.replace("de/life.html");
-        } else {
+        }} else {{
             window.location.replace("en/life.html");
-        }
+        }}
     </script>
 </head>
 <body class="text-gray-900 bg-white dark:bg-gray-950 dark:text-gray-100">
@@ -535,9 +2231,472 @@ def main():
         </div>
     </div>
 </body>
-</html>''')
+</html>'''
+
+def prepare_assets(pages, thea, static_dir=STATIC_DIR, cache_dir=CACHE_DIR, build_assets=True):
+    """Fingerprint, store and derive every file the pages reference
+
+    Sources are read from static_dir and indexes cached in cache_dir (None:
+    no caches). Without build_assets the asset store is left alone and only
+    derivatives that already exist are used.
+
+    Returns (assets, referenced, files, css_version): {path: version and
+    image metadata} for render_img(), the referenced paths, {path: source}
+    of every file published as it is (originals, derivatives) and the
+    version of the stylesheet.
+    """
+    referenced = {CSS_ASSET, JS_ASSET}
+    for page_name, data in pages:
+        referenced.update(page_assets(page_name, data))
+    referenced.update(photo['photo'] for photo in thea['photos'])
+
+    # Fingerprint the stylesheet and every referenced image by content so
+    # URLs (and therefore pages) only change when the bytes do, and record
+    # image dimensions/placeholders (re-read only for changed files)
+    with phase('asset store'):
+        asset_index = load_asset_index(cache_file(cache_dir, ASSET_INDEX_PATH))
+        objects = {}
+        if build_assets and cache_dir:
+            objects = store_assets(referenced, asset_index, static_dir, cache_file(cache_dir, STORE_DIR),
+                                   data_references(pages, thea))
+
+    with phase('asset index'):
+        assets = {}
+        files = {}
+        for path in sorted(referenced):
+            entry = index_asset(asset_index, path, static_dir)
+            assets[path] = {'version': entry['hash'][:12], **entry.get('meta', {})} if entry else {}
+            if entry:
+                files[path] = objects.get(path, os.path.join(static_dir, path))
+        save_asset_index(asset_index, cache_file(cache_dir, ASSET_INDEX_PATH))
+        css_version = assets[CSS_ASSET].get('version', '0')
+
+    # Resized WebP/AVIF copies for srcset, encoded across all cores
+    with phase('image derivatives'):
+        derived_dir = cache_file(cache_dir, DERIVED_CACHE_DIR)
+        for path, derivatives in build_derivatives(sorted(referenced), asset_index, static_dir, derived_dir,
+                                                   cache_file(cache_dir, DERIVATIVE_INDEX_PATH),
+                                                   build_assets).items():
+            assets[path]['derivatives'] = derivatives
+            for variants in derivatives.values():
+                files.update((out, os.path.join(derived_dir, os.path.basename(out))) for _, out in variants)
+    return assets, referenced, files, css_version
+
+# What render_site() did: the writer holding the site, the page keys the
+# next render compares with (previous), the pages it rendered, {page: error}
+# for those that failed, {page: (seconds, bytes)} render timings, {path:
+# source} of the static files and derivatives and the asset index
+SiteRender = collections.namedtuple('SiteRender', 'writer manifest rendered failures timings files assets')
+
+def render_site(config=SiteConfig(), writer=None, previous=None, jobs=1, optimize=False):
+    """Render the whole site into writer and return a SiteRender
+
+    writer is a MemoryWriter (the default), DirectoryWriter, ArchiveWriter
+    or ReleaseWriter; paths are relative to the site root. previous are the
+    page keys of the writer's previous build (SiteRender.manifest, for a
+    ReleaseWriter only): pages built from the same inputs are kept instead
+    of rendered, as are failed pages. Pages render in jobs worker processes,
+    which needs a writer that writes to disk; with optimize they go through
+    optimize_html(). Referenced files are read from config.static_dir and
+    written along with the pages with config.copy_assets; the caches in
+    config.cache_dir are only rewritten when they change.
+    """
+    writer = writer or MemoryWriter()
+    with phase('load data'):
+        with open(config.template, 'r', encoding='utf-8') as f:
+            template = f.read()
+        pages, photos, movies, thea = load_site(config.data_dir, cache_file(config.cache_dir, CATALOG_INDEX_PATH))
+    assets, referenced, files, css_version = prepare_assets(pages, thea, config.static_dir, config.cache_dir,
+                                                            config.build_assets)
+    output = OptimizingWriter(writer, css_version) if optimize else writer
+
+    # Anything shared by all pages invalidates all of them: the template,
+    # its script, the build code itself and the navigation built from every title
+    with phase('change detection'):
+        site_key = hash_inputs(file_digest(config.template), file_digest(__file__), assets[JS_ASSET],
+                               nav_signature(photos, movies), css_version, optimize, config.gallery_batch)
+        manifest = {}
+        render_jobs = []
+        for page_name, data in pages:
+            page_versions = [assets[path] for path in page_assets(page_name, data)]
+            for lang in config.languages:
+                path = f'{lang}/{page_name}.html'
+                # A record's content hash stands for its entry (and its cached terms)
+                content = data['hash'] if 'entry_file' in data else data
+                manifest[path] = hash_inputs(site_key, lang, page_name, content, page_versions)
+                if previous and previous.get(path) == manifest[path] and output.keep(path):
+                    continue
+                print(f"    Creating {path}...")
+                render_jobs.append((lang, page_name))
+
+    with phase('navigation'):
+        navs = build_navs(photos, movies, config.languages)
+
+    with phase('render pages'):
+        shared = (template, photos, movies, css_version, assets, dict(pages), navs, output, config.gallery_batch)
+        timings, failures = render_pages(render_jobs, jobs, shared)
+    rendered = list(timings)
+
+    with phase('search index'):
+        for lang in config.languages:
+            for name, data in build_search_index(lang, pages).items():
+                with output.open(f'{lang}/search/{name}') as f:
+                    json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+    # Create thea subsite
+    print("  Processing thea.json...")
+    path = 'thea/index.html'
+    manifest[path] = hash_inputs(file_digest(__file__), thea, css_version, optimize,
+                                 [assets[photo['photo']] for photo in thea['photos']])
+    if not (previous and previous.get(path) == manifest[path] and output.keep(path)):
+        start = time.perf_counter()
+        with phase('thea page'):
+            create_thea_page(thea, css_version, assets=assets, writer=output)
+        timings[path] = (time.perf_counter() - start, output.size(path))
+        rendered.append(path)
+
+    # Create index page with language detection
+    print("  Creating index page...")
+    with output.open('index.html') as f:
+        f.write(render_index_page(assets))
+
+    # Failed pages stay out of the manifest so the next build retries them;
+    # a previous build keeps its version of them online
+    for path in sorted(failures):
+        del manifest[path]
+        if previous is not None:
+            output.keep(path)
+
+    if config.copy_assets:
+        with phase('copy assets'):
+            for path, source in sorted(files.items()):
+                output.copy(path, source)
+
+    # Images are cached by the service worker when first shown, together with
+    # the JSON files pages load on demand
+    with phase('service worker'):
+        digests = output.digests()
+        runtime = set(files) - {CSS_ASSET}
+        runtime.update(path for path in digests
+                       if path.split('/', 1)[0] in config.languages and path.endswith('.json'))
+        write_service_worker(digests, runtime, output, config.languages)
+    return SiteRender(writer, manifest, rendered, failures, timings, files, assets)
+
+def build_site(incremental=False, jobs=1, compress=False, optimize=False, config=SiteConfig(),
+               page_budget=None, image_budget=None):
+    """Build the static site into public/
+
+    render_site() writes the complete site into a staging release through a
+    ReleaseWriter, which links current pages (with incremental) and
+    unchanged files over from public/; the release then becomes the new
+    public/ at once (see swap_staging()), and the content hash of every
+    file in public/ is recorded for publish().
+
+    With compress, every text file is also written as precompressed .gz/.br.
+    With optimize, pages are minified and inline their critical CSS.
+    config names the data, template and languages (see SiteConfig); photo
+    grids with more than config.gallery_batch photos load the rest on scroll.
+    Pages and images above page_budget/image_budget (KB) count as failures.
+
+    Returns (outputs, failures): the pages that were rendered and {output:
+    error} for pages that failed to render, as paths under public/.
+    """
+    print("Building Ina Berneis website...")
+    _profile.clear()
+
+    previous = load_manifest() if incremental else {}
+    shutil.rmtree(STAGING_DIR, ignore_errors=True)
+    writer = ReleaseWriter(STAGING_DIR, 'public', load_deploy_index())
+    result = render_site(config._replace(copy_assets=True, cache_dir=CACHE_DIR, build_assets=True), writer,
+                         previous.get('pages', {}), jobs, optimize)
+    for path, error in sorted(result.failures.items()):
+        print(f"  Failed to render public/{path}: {error}")
+
+    if compress:
+        with phase('compress'):
+            compress_outputs(STAGING_DIR)
+    with phase('swap'):
+        swap_staging()
+    with phase('manifest'):
+        save_manifest({'pages': result.manifest})
+    with phase('deploy manifest'):
+        added, changed, removed = update_deploy_index()
+    print(f"  Deploy manifest: {len(added)} added, {len(changed)} changed, {len(removed)} removed")
+
+    with phase('page weights'):
+        over_budget = check_page_weights(page_budget, image_budget)
+    for path, problem in sorted(over_budget.items()):
+        print(f"  Over budget: {path} {problem}")
+    total = len(result.manifest) + len(result.failures)
+    print(f"  Rendered {len(result.rendered)} of {total} pages")
+
+    _profile['pages'] = result.timings
+    _profile['counts'] = {
+        'pages rendered': len(result.rendered),
+        'pages total': total,
+        'pages failed': len(result.failures),
+        'pages over budget': len(over_budget),
+        'images': len(set(result.assets) - {CSS_ASSET, JS_ASSET}),
+    }
+    failures = {f'public/{path}': error for path, error in result.failures.items()}
+    failures.update(over_budget)
 
     # print("✓ Build complete! Run 'npm run build-css' to generate CSS.")
+    return [f'public/{path}' for path in result.rendered], failures
+
+def snapshot_sources():
+    """Return {path: (mtime, size)} for every file watched by --watch"""
+    files = []
+    for path in WATCH_PATHS:
+        if os.path.isdir(path):
+            files.extend(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+        else:
+            files.append(path)
+    snapshot = {}
+    for path in files:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        snapshot[path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+def watch_sources(interval=0.3):
+    """Yield the set of changed source files after every change
+
+    Uses filesystem notifications when watchdog is installed and polls every
+    interval seconds otherwise.
+    """
+    wakeup = threading.Event()
+    if Observer is not None:
+        handler = FileSystemEventHandler()
+        handler.on_any_event = lambda event: wakeup.set()
+        observer = Observer()
+        observer.schedule(handler, 'data', recursive=True)
+        if os.path.isdir(STATIC_DIR):
+            observer.schedule(handler, STATIC_DIR, recursive=True)
+        observer.schedule(handler, '.', recursive=False)
+        observer.daemon = True
+        observer.start()
+
+    previous = snapshot_sources()
+    while True:
+        if wakeup.wait(1.0 if Observer is not None else interval):
+            # Let editors finish writing (save-to-temp-and-rename etc.)
+            time.sleep(0.05)
+            wakeup.clear()
+        current = snapshot_sources()
+        changed = {path for path in previous.keys() | current.keys() if previous.get(path) != current.get(path)}
+        previous = current
+        if changed:
+            yield changed
+
+def output_urls(outputs):
+    """Map files written under public/ to the URL paths browsers view them at"""
+    urls = set()
+    for output in outputs:
+        url = '/' + os.path.relpath(output, 'public').replace(os.sep, '/')
+        urls.add(url)
+        if url.endswith('/index.html'):
+            urls.add(url[:-len('index.html')])
+    return urls
+
+class LiveReload:
+    """Track the pages open in preview browsers and tell them to reload"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients = {}
+
+    def subscribe(self, url):
+        """Register a browser viewing url; returns the queue its events arrive on"""
+        events = queue.Queue()
+        with self.lock:
+            self.clients.setdefault(url, set()).add(events)
+        return events
+
+    def unsubscribe(self, url, events):
+        with self.lock:
+            self.clients.get(url, set()).discard(events)
+
+    def notify(self, urls):
+        """Send a reload event to every browser viewing one of urls"""
+        with self.lock:
+            for url, clients in self.clients.items():
+                if url in urls:
+                    for events in clients:
+                        events.put('reload')
+
+class PreviewHandler(http.server.SimpleHTTPRequestHandler):
+    """Serve public/ without caching and with live reload injected into HTML"""
+
+    live_reload = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory='public', **kwargs)
+
+    def end_headers(self):
+        self.send_header('Cache-Control', 'no-store')
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == '/__livereload':
+            page = urllib.parse.parse_qs(url.query).get('path', ['/'])[0]
+            return self.stream_events(urllib.parse.unquote(page))
+        if url.path == '/sw.js':
+            return self.send_body(PREVIEW_SERVICE_WORKER.encode('utf-8'), 'text/javascript')
+        path = self.translate_path(url.path)
+        if os.path.isdir(path) and url.path.endswith('/'):
+            path = os.path.join(path, 'index.html')
+        if path.endswith('.html') and os.path.isfile(path):
+            return self.send_html(path)
+        return super().do_GET()
+
+    def send_html(self, path):
+        with open(path, 'rb') as f:
+            body = f.read().replace(b'</body>', LIVE_RELOAD_SCRIPT.encode('utf-8') + b'</body>', 1)
+        self.send_body(body, 'text/html; charset=utf-8')
+
+    def send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_events(self, page):
+        """Hold a server-sent events stream open until the page needs a reload"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        events = self.live_reload.subscribe(page)
+        try:
+            while True:
+                try:
+                    event = events.get(timeout=15)
+                except queue.Empty:
+                    self.wfile.write(b': ping\n\n')
+                else:
+                    self.wfile.write(f'event: {event}\ndata: \n\n'.encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.live_reload.unsubscribe(page, events)
+
+def build_css():
+    """Rebuild public/assets/css/style.css (the package.json build-css script)"""
+    print("  Building CSS...")
+    try:
+        subprocess.run(['npm', 'run', '--silent', 'build-css'], check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"  CSS build failed: {e}")
+
+def watch(port, jobs, **options):
+    """Serve public/ on localhost and rebuild whenever a source file changes
+
+    Rebuilds are incremental, so only affected pages are re-rendered, and
+    only browsers viewing one of those pages are told to reload. options
+    are passed on to build_site() (compress, optimize, config, budgets).
+    """
+    build_site(incremental=True, jobs=jobs, **options)
+    live_reload = LiveReload()
+    PreviewHandler.live_reload = live_reload
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), PreviewHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving public/ at http://localhost:{port}/ - watching for changes (Ctrl-C to stop)")
+
+    try:
+        for changed in watch_sources():
+            print(f"Changed: {', '.join(sorted(changed))}")
+            try:
+                outputs, failures = build_site(incremental=True, jobs=jobs, **options)
+                # New classes in the template or styles need a new stylesheet,
+                # whose new hash then re-renders the pages referencing it
+                if changed & {'input.css', 'template.html'}:
+                    build_css()
+                    outputs += build_site(incremental=True, jobs=jobs, **options)[0]
+            except Exception as e:  # e.g. a half-written JSON file
+                print(f"  Build failed: {type(e).__name__}: {e}")
+                continue
+            live_reload.notify(output_urls(outputs))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+def main(argv=None):
+    """Main function to build the static site"""
+    parser = argparse.ArgumentParser(description='Build the Ina Berneis website.')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only re-render pages whose inputs changed since the last build')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='render pages in N worker processes (0 = one per CPU core)')
+    parser.add_argument('--optimize', action='store_true',
+                        help='minify pages, inline their critical CSS and load style.css asynchronously')
+    parser.add_argument('--gallery-batch', type=int, default=GALLERY_BATCH, metavar='N',
+                        help='photo grids with more than N photos load them in batches of N on scroll '
+                             f'(0 = off, default: {GALLERY_BATCH})')
+    parser.add_argument('--page-budget', type=float, metavar='KB',
+                        help='fail the build if a page (HTML, CSS and image src files) weighs more than KB')
+    parser.add_argument('--image-budget', type=float, metavar='KB',
+                        help='fail the build if a page uses an image larger than KB')
+    parser.add_argument('--render-to', metavar='PATH',
+                        help='render the complete site with its images into a directory or a .zip/.tar(.gz) '
+                             'archive instead of building public/')
+    parser.add_argument('--compress', action='store_true',
+                        help='write precompressed .gz/.br siblings of HTML, CSS and JS files')
+    parser.add_argument('--publish', metavar='DIR',
+                        help='after a successful build, copy the files that changed since the last publish to DIR')
+    parser.add_argument('--watch', action='store_true',
+                        help='serve public/ and rebuild/reload pages whenever the sources change')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='port of the --watch preview server (default: 8000)')
+    parser.add_argument('--profile', nargs='?', const=PROFILE_PATH, metavar='PATH',
+                        help=f'write per-phase/per-page timings as JSON (default: {PROFILE_PATH}) '
+                             'and print a summary')
+    parser.add_argument('--cprofile', metavar='PATH',
+                        help='dump cProfile statistics of the build to PATH')
+    args = parser.parse_args(argv)
+    jobs = args.jobs or os.cpu_count() or 1
+
+    config = SiteConfig(gallery_batch=args.gallery_batch)
+    options = dict(compress=args.compress, optimize=args.optimize, config=config,
+                   page_budget=args.page_budget, image_budget=args.image_budget)
+
+    if args.watch:
+        watch(args.port, jobs, **options)
+        return
+    if args.render_to:
+        writer = open_writer(args.render_to)
+        try:
+            render_site(config._replace(copy_assets=True, build_assets=True), writer, optimize=args.optimize)
+        finally:
+            writer.close()
+        print(f"Site rendered to {args.render_to}")
+        return
+
+    profiler = cProfile.Profile() if args.cprofile else None
+    if profiler:
+        profiler.enable()
+    start = time.perf_counter()
+    _, failures = build_site(args.incremental, jobs, **options)
+    total_seconds = time.perf_counter() - start
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+        print(f"cProfile statistics written to {args.cprofile}")
+    if args.profile:
+        write_profile(args.profile, total_seconds)
+    if failures:
+        raise SystemExit(1)
+    if args.publish:
+        publish(args.publish)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,419 @@
+// Scripts shared by all pages of the site, loaded at the end of <body>.
+// Relative URLs (search/, fragments/, ../sw.js) resolve against the page.
+
+// Mobile Menu
+(function() {
+    const menuToggle = document.getElementById('menu-toggle');
+    const menuClose = document.getElementById('menu-close');
+    const menuOverlay = document.getElementById('menu-overlay');
+    const sidebar = document.getElementById('sidebar');
+
+    function openMenu() {
+        sidebar.scrollTop = 0;
+        sidebar.classList.remove('-translate-x-full');
+        sidebar.classList.add('translate-x-0');
+        menuOverlay.classList.remove('hidden');
+        document.body.style.overflow = 'hidden';
+    }
+
+    function closeMenu() {
+        sidebar.classList.add('-translate-x-full');
+        sidebar.classList.remove('translate-x-0');
+        menuOverlay.classList.add('hidden');
+        document.body.style.overflow = '';
+    }
+
+    menuToggle.addEventListener('click', openMenu);
+    menuClose.addEventListener('click', closeMenu);
+    menuOverlay.addEventListener('click', closeMenu);
+
+    // Close menu on navigation link click (mobile); delegated, so
+    // links added later (search results) close it too
+    sidebar.addEventListener('click', e => {
+        if (e.target.closest('a') && window.innerWidth < 768) {
+            closeMenu();
+        }
+    });
+
+    // Reset on resize
+    window.addEventListener('resize', () => {
+        if (window.innerWidth >= 768) {
+            closeMenu();
+        }
+    });
+})();
+
+// Lightbox
+(function() {
+    const lightbox = document.getElementById('lightbox');
+    const lightboxImg = document.getElementById('lightbox-img');
+
+    function openLightbox(src, alt) {
+        lightboxImg.src = src;
+        lightboxImg.alt = alt || '';
+        lightbox.classList.add('active');
+        document.body.style.overflow = 'hidden';
+    }
+
+    function closeLightbox() {
+        lightbox.classList.remove('active');
+        document.body.style.overflow = '';
+    }
+
+    // Click on photo to open lightbox (delegated, so photos appended
+    // by the gallery script open it too)
+    document.addEventListener('click', function(e) {
+        const container = e.target.closest('.photo-container');
+        const img = container && container.querySelector('img');
+        if (img) {
+            openLightbox(img.src, img.alt);
+        }
+    });
+
+    // Click anywhere on lightbox to close
+    lightbox.addEventListener('click', closeLightbox);
+
+    // Close on Escape key
+    document.addEventListener('keydown', function(e) {
+        if (e.key === 'Escape') {
+            if (lightbox.classList.contains('active')) {
+                closeLightbox();
+            } else {
+                // Close menu if open
+                const sidebar = document.getElementById('sidebar');
+                const menuOverlay = document.getElementById('menu-overlay');
+                if (!menuOverlay.classList.contains('hidden')) {
+                    sidebar.classList.add('-translate-x-full');
+                    sidebar.classList.remove('translate-x-0');
+                    menuOverlay.classList.add('hidden');
+                    document.body.style.overflow = '';
+                }
+            }
+        }
+    });
+})();
+
+// Gallery
+(function() {
+    // Large photo grids render their first batch; the others are
+    // appended from gallery/<page>/<n>.json as the reader scrolls
+    let observer = null;
+
+    function setup() {
+        if (observer) observer.disconnect();
+        observer = null;
+        const gallery = document.querySelector('[data-gallery]');
+        if (!gallery) return;
+        const sentinel = document.getElementById('gallery-sentinel');
+        const total = Number(gallery.dataset.batches);
+        let next = 1;
+        let loading = false;
+
+        function loadNext() {
+            if (loading || next > total) return Promise.resolve();
+            loading = true;
+            return fetch(gallery.dataset.gallery + next + '.json')
+                .then(response => response.json())
+                .then(batch => {
+                    gallery.insertAdjacentHTML('beforeend', batch.html);
+                    next += 1;
+                    if (observer && next > total) {
+                        observer.disconnect();
+                    } else if (observer) {
+                        // Observe again so a sentinel that is still in view triggers the next batch
+                        observer.unobserve(sentinel);
+                        observer.observe(sentinel);
+                    }
+                })
+                .catch(() => {})
+                .finally(() => { loading = false; });
+        }
+
+        if (!('IntersectionObserver' in window)) {
+            (function loadAll() {
+                if (next <= total) loadNext().then(loadAll);
+            })();
+            return;
+        }
+        observer = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) loadNext();
+        }, { root: gallery.closest('main'), rootMargin: '0px 0px 800px 0px' });
+        observer.observe(sentinel);
+    }
+
+    setup();
+    // Content swapped in by the page navigation script
+    document.addEventListener('pagechange', setup);
+})();
+
+// Search
+(function() {
+    const input = document.getElementById('search-input');
+    const results = document.getElementById('search-results');
+    const files = {};
+    let timer;
+    let latest = 0;
+
+    // Same folding as the build (slugify): NFKD, ASCII only, lowercase
+    function fold(text) {
+        return text.normalize('NFKD').replace(/[^\x00-\x7f]/g, '').toLowerCase();
+    }
+
+    // index.json, docs-<n>.json or the shard of one first character, fetched once
+    function load(name) {
+        if (!files[name]) {
+            files[name] = fetch('search/' + name + '.json')
+                .then(response => response.ok ? response.json() : {})
+                .catch(() => ({}));
+        }
+        return files[name];
+    }
+
+    // {document number: 1 if the term is in its title, else 0} for all
+    // terms starting with prefix; postings are number * 2 + in title,
+    // delta-encoded
+    async function lookup(prefix) {
+        const shard = await load(prefix[0]);
+        const found = new Map();
+        for (const term in shard) {
+            if (term.startsWith(prefix)) {
+                let posting = 0;
+                for (const delta of shard[term]) {
+                    posting += delta;
+                    const number = posting >> 1;
+                    found.set(number, Math.max(found.get(number) || 0, posting & 1));
+                }
+            }
+        }
+        return found;
+    }
+
+    async function search(query) {
+        const index = await load('index');
+        const stopwords = index.stopwords || [];
+        const terms = (fold(query).match(/[a-z0-9]+/g) || [])
+            .filter(term => term.length >= index.min_term && !stopwords.includes(term));
+        if (!terms.length) return null;
+
+        // Documents matching every term, scored by the terms in their title
+        let hits = null;
+        for (const found of await Promise.all(terms.map(lookup))) {
+            if (!hits) {
+                hits = found;
+                continue;
+            }
+            const both = new Map();
+            for (const [number, inTitle] of found) {
+                if (hits.has(number)) both.set(number, hits.get(number) + inTitle);
+            }
+            hits = both;
+        }
+        // Documents are numbered alphabetically, so ties stay in title order
+        const top = [...hits].sort((a, b) => (b[1] - a[1]) || (a[0] - b[0])).slice(0, 20);
+        const docs = await Promise.all(top.map(([number]) => load('docs-' + Math.floor(number / index.per_file))));
+        return top.map(([number], i) => docs[i][number % index.per_file]);
+    }
+
+    function show(matches) {
+        results.innerHTML = '';
+        results.classList.toggle('hidden', !matches);
+        if (!matches) return;
+        if (!matches.length) {
+            const item = document.createElement('li');
+            item.className = 'px-3 text-sm text-gray-500';
+            item.textContent = results.dataset.empty;
+            results.appendChild(item);
+        }
+        for (const [page, title] of matches) {
+            const item = document.createElement('li');
+            const link = document.createElement('a');
+            link.href = page + '.html';
+            link.className = 'py-0 text-sm nav-link';
+            link.textContent = title;
+            item.appendChild(link);
+            results.appendChild(item);
+        }
+    }
+
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        timer = setTimeout(async () => {
+            const current = ++latest;
+            const matches = await search(input.value);
+            if (current === latest) show(matches);
+        }, 100);
+    });
+
+    input.addEventListener('keydown', e => {
+        if (e.key === 'Enter') {
+            const first = results.querySelector('a');
+            if (first) first.click();
+        } else if (e.key === 'Escape') {
+            input.value = '';
+            show(null);
+        }
+    });
+})();
+
+// Page Navigation
+(function() {
+    // Sidebar links load fragments/<page>.json (content, title, active
+    // page and language) and swap only the main content. Full pages
+    // remain the fallback without JS or when a fragment fails to load.
+    const content = document.getElementById('content');
+    const sidebar = document.getElementById('sidebar');
+    const activeClasses = sidebar.dataset.activeClass.split(' ');
+    const directory = location.pathname.slice(0, location.pathname.lastIndexOf('/') + 1);
+    const fragments = {};
+
+    // The page a link points to, if it is a page of this language
+    function pageOf(link) {
+        const url = new URL(link.href, location.href);
+        if (url.origin !== location.origin || !url.pathname.startsWith(directory)) return null;
+        const match = url.pathname.slice(directory.length).match(/^([^/]+)\.html$/);
+        return match && match[1];
+    }
+
+    function fetchFragment(page) {
+        if (!fragments[page]) {
+            fragments[page] = fetch('fragments/' + page + '.json').then(response => {
+                if (!response.ok) throw new Error(response.statusText);
+                return response.json();
+            });
+            fragments[page].catch(() => { delete fragments[page]; });
+        }
+        return fragments[page];
+    }
+
+    function show(fragment) {
+        content.innerHTML = fragment.content;
+        document.title = fragment.title + ' - Ina Berneis';
+        sidebar.querySelectorAll('a.nav-link').forEach(link => {
+            const active = pageOf(link) === fragment.page;
+            activeClasses.forEach(name => link.classList.toggle(name, active));
+        });
+        document.querySelectorAll('a[data-lang]').forEach(link => {
+            link.href = '../' + link.dataset.lang + '/' + fragment.page + '.html';
+        });
+        content.closest('main').scrollTop = 0;
+        window.scrollTo(0, 0);
+        document.dispatchEvent(new CustomEvent('pagechange'));
+    }
+
+    async function navigate(page, href, push) {
+        let fragment;
+        try {
+            fragment = await fetchFragment(page);
+        } catch (e) {
+            window.location.href = href;
+            return;
+        }
+        if (push) history.pushState({ page: page }, '', href);
+        show(fragment);
+    }
+
+    sidebar.addEventListener('click', e => {
+        const link = e.target.closest('a');
+        if (!link || e.defaultPrevented || e.button !== 0 || e.metaKey || e.ctrlKey || e.shiftKey || e.altKey) return;
+        const page = pageOf(link);
+        if (!page) return;
+        e.preventDefault();
+        navigate(page, link.href, true);
+    });
+
+    // Prefetch on hover, focus or touch
+    function prefetch(e) {
+        const link = e.target.closest && e.target.closest('a');
+        const page = link && pageOf(link);
+        if (page) fetchFragment(page);
+    }
+    sidebar.addEventListener('mouseover', prefetch);
+    sidebar.addEventListener('focusin', prefetch);
+    sidebar.addEventListener('touchstart', prefetch, { passive: true });
+
+    history.replaceState({ page: pageOf(location) }, '');
+    window.addEventListener('popstate', e => {
+        if (e.state && e.state.page) navigate(e.state.page, location.href, false);
+    });
+})();
+
+// Dark Mode Toggle
+(function() {
+    const toggle = document.getElementById('dark-mode-toggle');
+    const toggleMobile = document.getElementById('dark-mode-toggle-mobile');
+    const icon = document.getElementById('theme-icon');
+    const iconMobile = document.getElementById('theme-icon-mobile');
+
+    // Get current mode: 'dark', 'light', or 'system'
+    function getMode() {
+        if (localStorage.theme === 'dark') return 'dark';
+        if (localStorage.theme === 'light') return 'light';
+        return 'system';
+    }
+
+    function applyMode(mode) {
+        if (mode === 'dark') {
+            document.documentElement.classList.add('dark');
+            localStorage.theme = 'dark';
+        } else if (mode === 'light') {
+            document.documentElement.classList.remove('dark');
+            localStorage.theme = 'light';
+        } else {
+            localStorage.removeItem('theme');
+            if (window.matchMedia('(prefers-color-scheme: dark)').matches) {
+                document.documentElement.classList.add('dark');
+            } else {
+                document.documentElement.classList.remove('dark');
+            }
+        }
+        updateIcons(mode);
+    }
+
+    function updateIcons(mode) {
+        let path;
+        if (mode === 'light') {
+            // Sun icon for light mode
+            path = '<path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 3v1m0 16v1m9-9h-1M4 12H3m15.364 6.364l-.707-.707M6.343 6.343l-.707-.707m12.728 0l-.707.707M6.343 17.657l-.707.707M16 12a4 4 0 11-8 0 4 4 0 018 0z"></path>';
+        } else if (mode === 'dark') {
+            // Moon icon for dark mode
+            path = '<path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M20.354 15.354A9 9 0 018.646 3.646 9.003 9.003 0 0012 21a9.003 9.003 0 008.354-5.646z"></path>';
+        } else {
+            // Computer/monitor icon for system mode
+            path = '<path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9.75 17L9 20l-1 1h8l-1-1-.75-3M3 13h18M5 17h14a2 2 0 002-2V5a2 2 0 00-2-2H5a2 2 0 00-2 2v10a2 2 0 002 2z"></path>';
+        }
+        icon.innerHTML = path;
+        iconMobile.innerHTML = path;
+    }
+
+    function cycleMode() {
+        const current = getMode();
+        let next;
+        if (current === 'light') next = 'dark';
+        else if (current === 'dark') next = 'system';
+        else next = 'light';
+        applyMode(next);
+    }
+
+    // Cycle: light -> dark -> system -> light
+    toggle.addEventListener('click', cycleMode);
+    toggleMobile.addEventListener('click', cycleMode);
+
+    // Initialize icons
+    updateIcons(getMode());
+
+    // Listen for system preference changes
+    window.matchMedia('(prefers-color-scheme: dark)').addEventListener('change', (e) => {
+        if (getMode() === 'system') {
+            if (e.matches) {
+                document.documentElement.classList.add('dark');
+            } else {
+                document.documentElement.classList.remove('dark');
+            }
+        }
+    });
+})();
+
+// Service Worker Registration
+if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.register('../sw.js');
+}